@@ -0,0 +1,560 @@
+"""
+Compressed sparse row (CSR) graphs for algorithmic thinking
+
+A CSRGraph keeps the adjacency of a graph in two int32 arrays instead of a dictionary of sets. Node labels are
+renumbered densely (0..n-1) in the order they are first seen; the neighbours of dense node i are
+targets[offsets[i]:offsets[i + 1]].
+
+For read access a CSRGraph behaves like the dictionary graphs used everywhere else: graph[node], graph.keys(),
+len(graph), iteration and membership all work with the original node labels.
+"""
+__author__ = 'mamaray'
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import izip
+
+# C int is 32 bits on every platform we run on
+INDEX_TYPECODE = 'i'
+
+# integer node labels are stored as C longs in cache files
+LABEL_TYPECODE = 'l'
+
+# cache file layout: magic, header, source path, labels, offsets, targets
+CACHE_SUFFIX = ".csr"
+CACHE_MAGIC = "CSRGRAPH"
+CACHE_HEADER = struct.Struct("=8s c B B x q d q q i")
+
+
+def _zeros(size):
+    """
+    Make an int32 array of the given size filled with 0
+
+    :rtype : array
+    :param size: number of entries
+    """
+    return array(INDEX_TYPECODE, [0]) * size
+
+
+class CSRGraph:
+    """
+    Read-only graph stored as compressed sparse rows
+    """
+
+    def __init__(self, labels, offsets, targets):
+        """
+        Create a graph from its dense representation
+
+        :param labels: sequence mapping dense node ids to node labels
+        :param offsets: int32 array of len(labels) + 1 row offsets into targets
+        :param targets: int32 array of dense neighbour ids
+        """
+        self._labels = labels
+        self._offsets = offsets
+        self._targets = targets
+
+        # skip the label lookup table when the labels already are the dense ids
+        self._index = None
+        for idx, label in enumerate(labels):
+            if label != idx:
+                self._index = dict((label, pos) for pos, label in enumerate(labels))
+                break
+
+    def __len__(self):
+        """
+        Number of nodes in the graph
+        """
+        return len(self._labels)
+
+    def __iter__(self):
+        """
+        Iterate over the node labels
+        """
+        return iter(self._labels)
+
+    def __contains__(self, node):
+        """
+        Check if a node label is in the graph
+        """
+        if self._index is None:
+            return isinstance(node, (int, long)) and 0 <= node < len(self._labels)
+        return node in self._index
+
+    def __getitem__(self, node):
+        """
+        Get the neighbours of a node as a list of node labels
+
+        :rtype : list
+        :param node: node label
+        """
+        idx = self.node_index(node)
+        row = self._targets[self._offsets[idx]:self._offsets[idx + 1]]
+        if self._index is None:
+            return row.tolist()
+
+        labels = self._labels
+        return [labels[target] for target in row]
+
+    def keys(self):
+        """
+        List of node labels, in dense id order
+
+        :rtype : list
+        """
+        return list(self._labels)
+
+    def node_index(self, node):
+        """
+        Get the dense id of a node label
+
+        :rtype : int
+        :param node: node label
+        """
+        if self._index is None:
+            if node not in self:
+                raise KeyError(node)
+            return node
+        return self._index[node]
+
+    def node_label(self, idx):
+        """
+        Get the node label of a dense id
+
+        :param idx: dense node id
+        """
+        return self._labels[idx]
+
+    def labels(self):
+        """
+        Get the dense id to label mapping
+        """
+        return self._labels
+
+    def offsets(self):
+        """
+        Get the int32 row offsets array (length num_nodes() + 1)
+
+        :rtype : array
+        """
+        return self._offsets
+
+    def targets(self):
+        """
+        Get the int32 array of dense neighbour ids
+
+        :rtype : array
+        """
+        return self._targets
+
+    def num_nodes(self):
+        """
+        Number of nodes in the graph
+
+        :rtype : int
+        """
+        return len(self._labels)
+
+    def num_edges(self):
+        """
+        Number of stored (directed) edges
+
+        :rtype : int
+        """
+        return len(self._targets)
+
+    def neighbours(self, idx):
+        """
+        Get the dense neighbour ids of a dense node id
+
+        :rtype : array
+        :param idx: dense node id
+        """
+        return self._targets[self._offsets[idx]:self._offsets[idx + 1]]
+
+    def out_degrees(self):
+        """
+        Out-degree of every node, indexed by dense id
+
+        :rtype : array
+        """
+        offsets = self._offsets
+        degrees = _zeros(len(self._labels))
+        for idx in xrange(len(degrees)):
+            degrees[idx] = offsets[idx + 1] - offsets[idx]
+        return degrees
+
+    def in_degrees(self):
+        """
+        In-degree of every node, indexed by dense id
+
+        :rtype : array
+        """
+        degrees = _zeros(len(self._labels))
+        for target in self._targets:
+            degrees[target] += 1
+        return degrees
+
+    def to_dict(self):
+        """
+        Convert to a dictionary-of-sets graph
+
+        :rtype : dict
+        """
+        graph = {}
+        for node in self._labels:
+            graph[node] = set(self[node])
+        return graph
+
+
+class CSRBuilder:
+    """
+    Incrementally build a CSRGraph from adjacency rows
+
+    Rows may arrive in any order and may reference nodes whose own row comes later. If the same node is given more
+    than one row the last one wins, the same as assigning into a dictionary.
+    """
+
+    def __init__(self):
+        """
+        Create an empty builder
+        """
+        self._labels = []
+        self._index = {}
+
+        # dense id and end offset (into self._edges) of each row, in arrival order
+        self._row_ids = array(INDEX_TYPECODE)
+        self._row_ends = array(INDEX_TYPECODE)
+        self._edges = array(INDEX_TYPECODE)
+
+    def node_id(self, node):
+        """
+        Get the dense id of a node label, assigning the next free id to new labels
+
+        :rtype : int
+        :param node: node label
+        """
+        idx = self._index.get(node)
+        if idx is None:
+            idx = len(self._labels)
+            self._index[node] = idx
+            self._labels.append(node)
+        return idx
+
+    def add_row(self, node, neighbours):
+        """
+        Add the adjacency row of a node
+
+        :param node: node label
+        :param neighbours: iterable of neighbour labels (duplicates are ignored)
+        """
+        self._row_ids.append(self.node_id(node))
+
+        # only labels not seen before need the slower path through node_id
+        index = self._index
+        node_id = self.node_id
+        self._edges.extend([index[neighbour] if neighbour in index else node_id(neighbour)
+                            for neighbour in set(neighbours)])
+        self._row_ends.append(len(self._edges))
+
+    def build(self):
+        """
+        Lay the rows out in dense id order and return the graph
+
+        :rtype : CSRGraph
+        """
+        num_nodes = len(self._labels)
+        row_ids = self._row_ids
+        row_ends = self._row_ends
+        edges = self._edges
+
+        # rows already arrived in dense id order, the edge array can be used as is
+        if len(row_ids) == num_nodes and all(row == idx for idx, row in enumerate(row_ids)):
+            offsets = array(INDEX_TYPECODE, [0])
+            offsets.extend(row_ends)
+            return CSRGraph(self._labels, offsets, edges)
+
+        # find where each node's (last) row lives in the edge array
+        starts = _zeros(num_nodes)
+        degrees = _zeros(num_nodes)
+        start = 0
+        for row, end in izip(row_ids, row_ends):
+            starts[row] = start
+            degrees[row] = end - start
+            start = end
+
+        # prefix sum of the degrees gives the row offsets
+        offsets = _zeros(num_nodes + 1)
+        for idx in xrange(num_nodes):
+            offsets[idx + 1] = offsets[idx] + degrees[idx]
+
+        # copy every row into its final place
+        targets = _zeros(offsets[num_nodes])
+        for idx in xrange(num_nodes):
+            start = starts[idx]
+            targets[offsets[idx]:offsets[idx + 1]] = edges[start:start + degrees[idx]]
+
+        return CSRGraph(self._labels, offsets, targets)
+
+
+def from_adjacency(rows):
+    """
+    Build a CSRGraph from (node, neighbours) pairs
+
+    :rtype : CSRGraph
+    :param rows: iterable of (node label, iterable of neighbour labels)
+    """
+    builder = CSRBuilder()
+    for node, neighbours in rows:
+        builder.add_row(node, neighbours)
+    return builder.build()
+
+
+def from_dict(graph):
+    """
+    Build a CSRGraph from a dictionary-of-sets graph
+
+    :rtype : CSRGraph
+    :param graph: dictionary graph
+    """
+    return from_adjacency(graph.iteritems())
+
+
+def as_csr(graph):
+    """
+    Get a CSRGraph view of any graph, converting dictionary graphs
+
+    :rtype : CSRGraph
+    :param graph: CSRGraph or dictionary graph
+    """
+    if isinstance(graph, CSRGraph):
+        return graph
+    return from_dict(graph)
+
+
+def _undirected_csr(num_nodes, chunks):
+    """
+    Build an undirected CSRGraph over nodes 0..num_nodes-1 from edge chunks, in two passes
+
+    :rtype : CSRGraph
+    :param num_nodes: number of nodes
+    :param chunks: function returning a fresh iterable of int32 arrays of flattened (node, node) pairs; it is called
+                   once to count the degrees and once to place the edges
+    """
+    # first pass: degrees, then their prefix sum as row offsets
+    degrees = _zeros(num_nodes)
+    for chunk in chunks():
+        for node in chunk:
+            degrees[node] += 1
+
+    offsets = _zeros(num_nodes + 1)
+    for idx in xrange(num_nodes):
+        offsets[idx + 1] = offsets[idx] + degrees[idx]
+
+    # second pass: put both directions of every edge at the next free slot of its row
+    positions = offsets[:-1]
+    targets = _zeros(offsets[num_nodes])
+    for chunk in chunks():
+        for idx in xrange(0, len(chunk), 2):
+            node_a = chunk[idx]
+            node_b = chunk[idx + 1]
+            targets[positions[node_a]] = node_b
+            positions[node_a] += 1
+            targets[positions[node_b]] = node_a
+            positions[node_b] += 1
+
+    return CSRGraph(xrange(num_nodes), offsets, targets)
+
+
+def from_edges(num_nodes, chunks):
+    """
+    Build an undirected CSRGraph from a stream of edges
+
+    Every edge must be listed once, in either direction. The chunks are gathered into one int32 array first, so this
+    needs memory for the edge list besides the graph; use read_edge_file to build from a file without it.
+
+    :rtype : CSRGraph
+    :param num_nodes: number of nodes, the graph has labels 0..num_nodes-1
+    :param chunks: iterable of int32 arrays of flattened (node, node) pairs
+    """
+    edges = array(INDEX_TYPECODE)
+    for chunk in chunks:
+        edges.extend(chunk)
+    return _undirected_csr(num_nodes, lambda: [edges])
+
+
+def _read_edge_chunks(filename, chunk_size):
+    """
+    Read an edge file back in chunks
+
+    :param filename: edge file name
+    :param chunk_size: number of edges per chunk
+    :return: generator of int32 arrays of flattened (node, node) pairs
+    """
+    edge_file = open(filename, "rb")
+    try:
+        while True:
+            chunk = array(INDEX_TYPECODE)
+            try:
+                chunk.fromfile(edge_file, 2 * chunk_size)
+            except EOFError:
+                # the last chunk is short, fromfile keeps what it could read
+                pass
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        edge_file.close()
+
+
+def read_edge_file(filename, num_nodes, chunk_size=1 << 16):
+    """
+    Build an undirected CSRGraph from a binary edge file
+
+    The file is a flat sequence of native int32 (node, node) pairs, each edge once, as written by array.tofile. It is
+    read twice in chunks, so apart from the graph itself only one chunk is held in memory.
+
+    :rtype : CSRGraph
+    :param filename: edge file name
+    :param num_nodes: number of nodes, the graph has labels 0..num_nodes-1
+    :param chunk_size: number of edges read at a time
+    """
+    return _undirected_csr(num_nodes, lambda: _read_edge_chunks(filename, chunk_size))
+
+
+def cache_filename(source):
+    """
+    Name of the binary sidecar file that caches a parsed graph file
+
+    :rtype : str
+    :param source: graph file name
+    """
+    return source + CACHE_SUFFIX
+
+
+def _source_key(source):
+    """
+    Identify a source file by absolute path, size and modification time
+
+    :rtype : tuple
+    :param source: graph file name
+    """
+    stat = os.stat(source)
+    return os.path.abspath(source), stat.st_size, stat.st_mtime
+
+
+def save(graph, filename, key=("", 0, 0.0)):
+    """
+    Write a graph to a binary file, tagged with a key that load checks
+
+    Only graphs with integer labels can be saved. The file is written under a temporary name and renamed into place,
+    so readers never see a partial file.
+
+    :rtype : bool
+    :param graph: CSRGraph
+    :param filename: file to write
+    :param key: (name, size, mtime) tuple identifying what the graph was built from
+    :return: True if the file was written
+    """
+    try:
+        labels = array(LABEL_TYPECODE, graph.labels())
+    except (TypeError, OverflowError):
+        return False
+
+    path, size, mtime = key
+    header = CACHE_HEADER.pack(CACHE_MAGIC, sys.byteorder[0], labels.itemsize, array(INDEX_TYPECODE).itemsize,
+                               size, mtime, graph.num_nodes(), graph.num_edges(), len(path))
+
+    tmp_filename = filename + ".tmp"
+    try:
+        cache = open(tmp_filename, "wb")
+        try:
+            cache.write(header)
+            cache.write(path)
+            labels.tofile(cache)
+            graph.offsets().tofile(cache)
+            graph.targets().tofile(cache)
+        finally:
+            cache.close()
+        os.rename(tmp_filename, filename)
+    except (IOError, OSError):
+        # caching is best effort, e.g. the data directory may be read-only
+        return False
+
+    return True
+
+
+def load(filename, key=("", 0, 0.0)):
+    """
+    Load a graph written by save through a memory map of the file
+
+    :rtype : CSRGraph
+    :param filename: file to read
+    :param key: the key the graph must have been saved with
+    :return: the graph, or None if there is no such file or its key does not match
+    """
+    if not os.path.exists(filename):
+        return None
+
+    cache = open(filename, "rb")
+    try:
+        if os.fstat(cache.fileno()).st_size < CACHE_HEADER.size:
+            return None
+        buf = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        cache.close()
+
+    try:
+        (magic, byteorder, label_size, index_size, size, mtime, num_nodes, num_edges,
+         path_len) = CACHE_HEADER.unpack_from(buf)
+
+        # the file must have the right key and match this machine's array layout
+        pos = CACHE_HEADER.size
+        path = buf[pos:pos + path_len]
+        if (magic != CACHE_MAGIC or byteorder != sys.byteorder[0]
+                or label_size != array(LABEL_TYPECODE).itemsize or index_size != array(INDEX_TYPECODE).itemsize
+                or (path, size, mtime) != tuple(key)):
+            return None
+
+        # copy each section once, from a buffer over the map straight into its array
+        pos += path_len
+        sections = []
+        for typecode, count in ((LABEL_TYPECODE, num_nodes), (INDEX_TYPECODE, num_nodes + 1),
+                                (INDEX_TYPECODE, num_edges)):
+            section = array(typecode)
+            end = pos + count * section.itemsize
+            if end > len(buf):
+                return None
+            section.fromstring(buffer(buf, pos, end - pos))
+            sections.append(section)
+            pos = end
+    finally:
+        buf.close()
+
+    labels, offsets, targets = sections
+    return CSRGraph(labels, offsets, targets)
+
+
+def write_cache(graph, source):
+    """
+    Write a graph parsed from source to its binary sidecar file
+
+    :rtype : bool
+    :param graph: CSRGraph parsed from source
+    :param source: graph file name
+    :return: True if the cache was written
+    """
+    return save(graph, cache_filename(source), _source_key(source))
+
+
+def read_cache(source):
+    """
+    Load the cached graph of a source file through a memory map of its sidecar file
+
+    :rtype : CSRGraph
+    :param source: graph file name
+    :return: the cached graph, or None if there is no cache or it is stale
+    """
+    return load(cache_filename(source), _source_key(source))
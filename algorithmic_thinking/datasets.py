@@ -0,0 +1,105 @@
+"""
+Lazy registry of generated graphs, cached per (generator, parameters, seed) in memory and on disk
+
+Saved graphs are only reused while the generator's source and DATASET_VERSION are unchanged. A change to code the
+generator calls (a seed graph, a trial class) is not seen in its source: bump DATASET_VERSION for those.
+"""
+__author__ = 'mamaray'
+
+import os
+import random
+import inspect
+import hashlib
+from algorithmic_thinking import csr_graph
+
+# generated graphs are saved here, one file per key
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_cache")
+
+# part of every key, bump it whenever generated graphs change without a change to the generator's own source
+DATASET_VERSION = 1
+
+# graphs built or loaded in this process, by key
+_graphs = {}
+
+
+def _source_digest(generator):
+    """
+    Hash of a generator's source code, empty if the source is not available
+    """
+    try:
+        source = inspect.getsource(generator)
+    except (IOError, TypeError):
+        return ""
+    return hashlib.md5(source).hexdigest()
+
+
+def dataset_key(generator, params, seed):
+    """
+    Key of a generated graph
+
+    :rtype : tuple
+    :param generator: graph generator function
+    :param params: tuple of arguments for the generator
+    :param seed: seed of the random module while the generator runs
+    :return: (qualified generator name, hash of its source, DATASET_VERSION, params, seed)
+    """
+    return (generator.__module__ + "." + generator.__name__, _source_digest(generator), DATASET_VERSION,
+            tuple(params), seed)
+
+
+def cache_filename(key):
+    """
+    File a generated graph is saved to
+
+    :rtype : str
+    :param key: key from dataset_key
+    """
+    return os.path.join(CACHE_DIR, hashlib.md5(repr(key)).hexdigest() + csr_graph.CACHE_SUFFIX)
+
+
+def dataset(generator, params, seed=0):
+    """
+    Get the graph generator(*params) builds with the random module seeded with seed
+
+    The graph is built on first use only: after that it comes from memory, or from the file saved by an earlier run.
+    The global random state is left as it was, so fetching a dataset does not change what the caller draws next.
+    Graphs are returned compact, the same whether they were just built or loaded; callers share the returned object.
+
+    :rtype : csr_graph.CSRGraph
+    :param generator: graph generator function, must be reachable by name for the key to stay stable across runs
+    :param params: tuple of arguments for the generator
+    :param seed: seed for the random module
+    """
+    key = dataset_key(generator, params, seed)
+    graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+
+    filename = cache_filename(key)
+    file_key = (repr(key), 0, 0.0)
+    compact = csr_graph.load(filename, file_key)
+
+    if compact is None:
+        state = random.getstate()
+        random.seed(seed)
+        try:
+            compact = csr_graph.as_csr(generator(*params))
+        finally:
+            random.setstate(state)
+
+        if not os.path.isdir(CACHE_DIR):
+            try:
+                os.makedirs(CACHE_DIR)
+            except OSError:
+                pass
+        csr_graph.save(compact, filename, file_key)
+
+    _graphs[key] = compact
+    return compact
+
+
+def clear():
+    """
+    Forget the graphs held in memory (files on disk are kept)
+    """
+    _graphs.clear()
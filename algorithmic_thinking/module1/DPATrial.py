@@ -6,6 +6,7 @@ Helper class for implementing efficient version of DPA algorithm
 
 # general imports
 import random
+from array import array
 
 
 class DPATrial:
@@ -52,3 +53,56 @@ class DPATrial:
 
         return new_node_neighbors
 
+
+class CompactDPATrial:
+    """
+    Memory-bounded alternative to DPATrial with the same node probabilities
+
+    DPATrial's list holds one entry per node plus one entry per edge endpoint, so a node is picked with probability
+    (in-degree + 1) / (total in-degree + number of nodes). This class keeps only the edge endpoints, in an int32
+    array (4 bytes per edge instead of an 8 byte list slot), and gets the "+ 1" part arithmetically: a draw below
+    the number of nodes picks that node directly, any other draw picks an edge endpoint.
+
+    The endpoint array lists each new node's neighbours in order, so it doubles as the target array of a CSR graph.
+    """
+
+    def __init__(self, num_nodes):
+        """
+        Initialize a CompactDPATrial object corresponding to a complete graph with num_nodes nodes
+        """
+        self._num_nodes = num_nodes
+        self._targets = array('i')
+        for node in xrange(num_nodes):
+            self._targets.extend(other for other in xrange(num_nodes) if other != node)
+
+    def targets(self):
+        """
+        Get the int32 array of edge endpoints, grouped by source node in node order
+        """
+        return self._targets
+
+    def run_trial(self, num_nodes):
+        """
+        Conduct num_nodes trials, drawn as one batch from the current distribution
+
+        Returns: Set of nodes
+        """
+        targets = self._targets
+        existing = self._num_nodes
+        total = existing + len(targets)
+
+        # compute the neighbors for the newly-created node
+        new_node_neighbors = set()
+        for draw in [int(random.random() * total) for dummy_idx in xrange(num_nodes)]:
+            if draw < existing:
+                new_node_neighbors.add(draw)
+            else:
+                new_node_neighbors.add(targets[draw - existing])
+
+        # every neighbour gains one in-degree, the new node's own weight comes from the node count
+        targets.extend(new_node_neighbors)
+
+        # update the number of nodes
+        self._num_nodes += 1
+
+        return new_node_neighbors
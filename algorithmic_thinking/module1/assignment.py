@@ -5,6 +5,7 @@ import algorithmic_thinking.utils as utils
 
 __author__ = 'mamaray'
 
+import os
 import math
 import project as project
 import matplotlib.pyplot as plt
@@ -12,6 +13,27 @@ import matplotlib.pyplot as plt
 LOG_BASE = 10
 SCALE = "LOG"
 
+# canvas size (in inches)
+FIGURE_SIZE = (12, 7)
+
+# citation data, next to this file
+CITATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alg_phys-cite.txt")
+_citation_graph = None
+
+
+def citation_graph():
+    """
+    Get the citation graph, parsed once and shared by all questions
+
+    The graph stays compact, so a cache hit is just the load of the binary sidecar file.
+
+    :rtype : csr_graph.CSRGraph
+    """
+    global _citation_graph
+    if _citation_graph is None:
+        _citation_graph = utils.read_graph_data(CITATION_FILE, compact=True, cache=True)
+    return _citation_graph
+
 
 def draw_plot(data, point_style, line_label):
     # get the NORMALIZED distribution of in-degrees
@@ -38,13 +60,9 @@ def draw_plot(data, point_style, line_label):
     plt.legend()
 
 
-# set the canvas size (in inches)
-plt.figure(figsize=(12, 7))
-
-
 def app_q1():
     # get the data into a dict
-    data = utils.read_graph_data("alg_phys-cite.txt")
+    data = citation_graph()
 
     draw_plot(data, "r+", "citations")
     plt.show()
@@ -54,7 +72,7 @@ def app_q2():
     data3 = project.generate_random_digraph(500, .25)
     data2 = project.generate_random_digraph(700, .55)
     data1 = project.generate_random_digraph(1000, .9)
-    data = utils.read_graph_data("alg_phys-cite.txt")
+    data = citation_graph()
 
     draw_plot(data, "r+", "citations")
     draw_plot(data3, "g^", "random_graph(500, .25)")
@@ -72,7 +90,7 @@ def app_q2_2():
 
 def app_q3():
     # get the data into a dict
-    data = utils.read_graph_data("alg_phys-cite.txt")
+    data = citation_graph()
     out_degrees = project.compute_out_degrees(data)
     in_degrees = project.compute_in_degrees(data)
 
@@ -97,11 +115,14 @@ def app_q4():
 def app_q5():
     # get the data into a dict
     data1 = project.dpa_graph(27770, 13)
-    data = utils.read_graph_data("alg_phys-cite.txt")
+    data = citation_graph()
 
     draw_plot(data, "r+", "citations")
     draw_plot(data1, "gs", "dpa_graph(27770,13)")
     plt.show()
 
 
-app_q5()
\ No newline at end of file
+if __name__ == "__main__":
+    # set the canvas size (in inches)
+    plt.figure(figsize=FIGURE_SIZE)
+    app_q5()
@@ -0,0 +1,343 @@
+"""
+Benchmarks for module 1 graph construction and statistics
+
+    python -m algorithmic_thinking.module1.benchmark [-o results.json] [-b baseline.json] [--save-baseline]
+                                                      [--scale F] [--repeat N] [--rounds N] [case ...]
+
+Every case is run for a sweep of graph sizes. Each (case, size) pair runs in a few fresh worker processes, the best
+of which is kept, so that its peak RSS is its own; setup (building the input graph, writing the input file) happens in the worker before the clock
+starts, and the peak RSS it reached is subtracted so that only the memory the case adds on top is compared. Results
+are written as JSON and compared against a stored baseline, and the exit status is 1 if any case got slower (or
+bigger) than the baseline by more than the tolerance.
+"""
+__author__ = 'mamaray'
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+
+import algorithmic_thinking.utils as utils
+from algorithmic_thinking.module1 import project
+
+# average out-degree of the generated input graphs
+AVERAGE_DEGREE = 13
+
+# baseline file used when none is given
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# allowed slowdown / growth against the baseline before a case counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# growth of the memory a case adds that is always allowed, RSS moves in whole pages and allocator arenas
+RSS_SLACK_KB = 1024
+
+# slowdown that is always allowed, sub-millisecond cases move by more than the tolerance on scheduler noise alone
+TIME_SLACK_SECONDS = 0.002
+
+# timed runs of a case continue past repeat until they add up to this many seconds, so fast cases get a stable best
+MIN_CASE_SECONDS = 0.5
+
+# fresh worker processes per (case, size) pair, the best one is kept: speed varies between processes by more than
+# between the runs inside one
+DEFAULT_ROUNDS = 3
+
+# temporary input files of the current worker
+_temp_files = []
+
+
+def _input_graph(size):
+    """
+    DPA input graph of the given size as a plain dictionary graph
+    """
+    random.seed(size)
+    return project.dpa_graph(size, AVERAGE_DEGREE, compact=True).to_dict()
+
+
+def _input_file(size):
+    """
+    Write a DPA input graph of the given size in the alg_phys-cite.txt format and return the file name
+    """
+    graph = _input_graph(size)
+    handle, filename = tempfile.mkstemp(suffix=".txt")
+    _temp_files.append(filename)
+    _temp_files.append(filename + ".csr")
+
+    data = os.fdopen(handle, "w")
+    for node in graph:
+        data.write(" ".join(str(entry) for entry in [node] + list(graph[node])) + " \n")
+    data.close()
+    return filename
+
+
+def _setup_read_graph_data(size):
+    filename = _input_file(size)
+    return lambda: utils.read_graph_data(filename)
+
+
+def _setup_read_graph_data_compact(size):
+    filename = _input_file(size)
+    return lambda: utils.read_graph_data(filename, compact=True, chunk_size=utils.CHUNK_SIZE)
+
+
+def _setup_read_graph_data_cached(size):
+    filename = _input_file(size)
+    utils.read_graph_data(filename, cache=True)
+    return lambda: utils.read_graph_data(filename, compact=True, cache=True)
+
+
+def _setup_compute_in_degrees(size):
+    graph = _input_graph(size)
+    return lambda: project.compute_in_degrees(graph)
+
+
+def _setup_in_degree_distribution(size):
+    graph = _input_graph(size)
+    return lambda: project.in_degree_distribution(graph)
+
+
+def _setup_in_degree_distribution_compact(size):
+    graph = project.dpa_graph(size, AVERAGE_DEGREE, compact=True)
+    return lambda: project.in_degree_distribution(graph)
+
+
+def _setup_generate_random_digraph(size):
+    return lambda: project.generate_random_digraph(size, float(AVERAGE_DEGREE) / size)
+
+
+def _setup_dpa_graph(size):
+    return lambda: project.dpa_graph(size, AVERAGE_DEGREE)
+
+
+def _setup_dpa_graph_compact(size):
+    return lambda: project.dpa_graph(size, AVERAGE_DEGREE, compact=True)
+
+
+def _setup_make_complete_graph(size):
+    return lambda: project.make_complete_graph(size)
+
+
+# case name -> (setup function, default sizes)
+CASES = {
+    "read_graph_data": (_setup_read_graph_data, [1000, 10000, 100000]),
+    "read_graph_data_compact": (_setup_read_graph_data_compact, [1000, 10000, 100000]),
+    "read_graph_data_cached": (_setup_read_graph_data_cached, [1000, 10000, 100000]),
+    "compute_in_degrees": (_setup_compute_in_degrees, [1000, 10000, 100000]),
+    "in_degree_distribution": (_setup_in_degree_distribution, [1000, 10000, 100000]),
+    "in_degree_distribution_compact": (_setup_in_degree_distribution_compact, [1000, 10000, 100000]),
+    "generate_random_digraph": (_setup_generate_random_digraph, [1000, 10000, 100000]),
+    "dpa_graph": (_setup_dpa_graph, [1000, 10000, 100000]),
+    "dpa_graph_compact": (_setup_dpa_graph_compact, [1000, 10000, 100000]),
+    "make_complete_graph": (_setup_make_complete_graph, [100, 300, 1000]),
+}
+
+
+def _peak_rss_kb():
+    """
+    Peak resident set size of this process in kilobytes
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, Linux kilobytes
+    if sys.platform == "darwin":
+        peak /= 1024
+    return peak
+
+
+def _run_case(task):
+    """
+    Worker: set up and time one (case, size) pair
+
+    :rtype : dict
+    :param task: (case name, size, repeat) tuple
+    """
+    name, size, repeat = task
+    try:
+        func = CASES[name][0](size)
+        setup_rss = _peak_rss_kb()
+
+        # best of at least repeat runs, and of at least MIN_CASE_SECONDS in total
+        best = None
+        runs = 0
+        total = 0.0
+        while runs < repeat or total < MIN_CASE_SECONDS:
+            start = time.time()
+            func()
+            elapsed = time.time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+            runs += 1
+            total += elapsed
+
+        # the peak is a high-water mark that includes the setup, only the growth past it belongs to the case
+        peak_rss = _peak_rss_kb()
+        return {"case": name, "size": size, "seconds": best, "runs": runs, "setup_rss_kb": setup_rss,
+                "peak_rss_kb": peak_rss, "case_rss_kb": peak_rss - setup_rss}
+    finally:
+        while _temp_files:
+            filename = _temp_files.pop()
+            if os.path.exists(filename):
+                os.remove(filename)
+
+
+def run(cases, scale=1.0, repeat=3, rounds=DEFAULT_ROUNDS):
+    """
+    Run the given benchmark cases, each (case, size) pair in rounds fresh worker processes
+
+    :rtype : dict
+    :param cases: case names, see CASES
+    :param scale: factor applied to every case's default sizes
+    :param repeat: minimum number of timed runs per process (see MIN_CASE_SECONDS)
+    :param rounds: number of worker processes per pair, the fastest time and smallest memory growth are reported
+    :return: JSON-ready dict with the environment and a list of results
+    """
+    tasks = []
+    for name in cases:
+        for size in CASES[name][1]:
+            tasks.append((name, max(int(size * scale), 2), repeat))
+
+    # a fresh process per task keeps peak RSS per case
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        measured = pool.map(_run_case, tasks * rounds, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    # best of the rounds, in task order
+    results = measured[:len(tasks)]
+    for idx, entry in enumerate(measured[len(tasks):]):
+        best = results[idx % len(tasks)]
+        best["runs"] += entry["runs"]
+        best["seconds"] = min(best["seconds"], entry["seconds"])
+        best["case_rss_kb"] = min(best["case_rss_kb"], entry["case_rss_kb"])
+
+    return {"python": platform.python_version(), "platform": platform.platform(), "repeat": repeat,
+            "rounds": rounds, "results": results}
+
+
+def same_sampling(report, baseline):
+    """
+    Whether two reports took their best times over the same number of runs and worker processes
+
+    :rtype : bool
+    """
+    return (report.get("repeat"), report.get("rounds", 1)) == (baseline.get("repeat"), baseline.get("rounds", 1))
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a benchmark report against a baseline report
+
+    :rtype : list
+    :param report: report from run()
+    :param baseline: report from an earlier run()
+    :param tolerance: allowed relative growth of time and of the memory the case itself adds (case_rss_kb); on top
+                      of it, time may grow by TIME_SLACK_SECONDS and memory by RSS_SLACK_KB
+    :return: list of (case, size, metric, baseline value, new value) regressions; times are only compared when both
+             reports took the best over the same repeat and rounds
+    """
+    previous = dict(((entry["case"], entry["size"]), entry) for entry in baseline["results"])
+    same_repeat = same_sampling(report, baseline)
+
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get((entry["case"], entry["size"]))
+        if old is None:
+            continue
+
+        if same_repeat and entry["seconds"] > old["seconds"] * (1 + tolerance) + TIME_SLACK_SECONDS:
+            regressions.append((entry["case"], entry["size"], "seconds", old["seconds"], entry["seconds"]))
+
+        # baselines from before case_rss_kb only hold the peak including setup, which is not comparable
+        if "case_rss_kb" in old and entry["case_rss_kb"] > old["case_rss_kb"] * (1 + tolerance) + RSS_SLACK_KB:
+            regressions.append((entry["case"], entry["size"], "case_rss_kb", old["case_rss_kb"],
+                                entry["case_rss_kb"]))
+
+    return regressions
+
+
+def print_report(report, baseline=None):
+    """
+    Print a report as a table, with the ratio to the baseline if there is one
+
+    :param report: report from run()
+    :param baseline: optional report to compare to
+    """
+    previous = {}
+    if baseline is not None:
+        previous = dict(((entry["case"], entry["size"]), entry) for entry in baseline["results"])
+
+    print "%-32s %10s %12s %12s %10s" % ("case", "size", "seconds", "case KB", "vs base")
+    for entry in report["results"]:
+        old = previous.get((entry["case"], entry["size"]))
+        ratio = ""
+        if old is not None and old["seconds"] > 0:
+            ratio = "%.2fx" % (entry["seconds"] / old["seconds"])
+        print "%-32s %10d %12.4f %12d %10s" % (entry["case"], entry["size"], entry["seconds"],
+                                              entry["case_rss_kb"], ratio)
+
+
+def main(argv=None):
+    """
+    Command line entry point
+
+    :rtype : int
+    :param argv: argument list, defaults to sys.argv[1:]
+    :return: exit status, 1 if there are regressions
+    """
+    parser = argparse.ArgumentParser(description="Benchmark module 1 graph construction and statistics")
+    parser.add_argument("cases", nargs="*", metavar="case",
+                        help="cases to run, any of " + " ".join(sorted(CASES)) + " (default: all)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-b", "--baseline", default=DEFAULT_BASELINE, help="baseline JSON file to compare to")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every case's graph sizes by this")
+    parser.add_argument("--repeat", type=int, default=3, help="minimum timed runs per case, size and worker process")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="worker processes per case and size, the best one is reported")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    for name in args.cases:
+        if name not in CASES:
+            parser.error("unknown case: " + name)
+
+    report = run(args.cases or sorted(CASES), args.scale, args.repeat, args.rounds)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        baseline_file = open(args.baseline, "r")
+        baseline = json.load(baseline_file)
+        baseline_file.close()
+
+    print_report(report, baseline)
+
+    for filename in [args.output, args.baseline if args.save_baseline else None]:
+        if filename:
+            output = open(filename, "w")
+            json.dump(report, output, indent=2, sort_keys=True)
+            output.close()
+
+    if baseline is None:
+        return 0
+
+    if not same_sampling(report, baseline):
+        print "WARNING: times not compared, repeat %d over %d rounds against a baseline of repeat %s over %s" % (
+            report["repeat"], report["rounds"], baseline.get("repeat"), baseline.get("rounds", 1))
+
+    regressions = compare(report, baseline, args.tolerance)
+    for case, size, metric, old, new in regressions:
+        print "REGRESSION %s(%d) %s: %s -> %s" % (case, size, metric, old, new)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Graph objects for module 1: a directed graph that keeps its degree statistics up to date, and an implicit complete
+graph
+"""
+__author__ = 'mamaray'
+
+
+def _shift(histogram, old_degree, new_degree):
+    """
+    Move one node from old_degree to new_degree in a degree histogram, dropping empty degrees
+
+    :param histogram: dict of degree -> number of nodes
+    :param old_degree: previous degree of the node, None for a new node
+    :param new_degree: current degree of the node, None for a removed node
+    """
+    if old_degree is not None:
+        histogram[old_degree] -= 1
+        if histogram[old_degree] == 0:
+            del histogram[old_degree]
+
+    if new_degree is not None:
+        histogram[new_degree] = histogram.get(new_degree, 0) + 1
+
+
+class Graph:
+    """
+    Directed graph that maintains in-degree, out-degree and degree-histogram counters as nodes and edges are added
+    or removed
+
+    Reads like the dictionary graphs (graph[node], keys(), len, iteration, membership), so it can be passed to the
+    functions in project. The degree distributions are read off the histograms in O(number of distinct degrees)
+    instead of rescanning the graph.
+    """
+
+    def __init__(self, graph=None):
+        """
+        Create an empty graph, or a copy of a dictionary graph
+
+        :param graph: optional dictionary graph to copy
+        """
+        self._out_edges = {}
+        self._in_edges = {}
+        self._in_histogram = {}
+        self._out_histogram = {}
+
+        if graph is not None:
+            for node in graph:
+                self.add_node(node)
+            for node in graph:
+                for head in graph[node]:
+                    self.add_edge(node, head)
+
+    def __len__(self):
+        """
+        Number of nodes in the graph
+        """
+        return len(self._out_edges)
+
+    def __iter__(self):
+        """
+        Iterate over the nodes
+        """
+        return iter(self._out_edges)
+
+    def __contains__(self, node):
+        """
+        Check if a node is in the graph
+        """
+        return node in self._out_edges
+
+    def __getitem__(self, node):
+        """
+        Get the set of nodes a node points to (do not modify it, use add_edge/remove_edge)
+
+        :rtype : set
+        :param node: node
+        """
+        return self._out_edges[node]
+
+    def keys(self):
+        """
+        List of nodes
+
+        :rtype : list
+        """
+        return self._out_edges.keys()
+
+    def add_node(self, node):
+        """
+        Add a node without edges, if it is not in the graph yet
+
+        :param node: node
+        """
+        if node in self._out_edges:
+            return
+
+        self._out_edges[node] = set()
+        self._in_edges[node] = set()
+        _shift(self._in_histogram, None, 0)
+        _shift(self._out_histogram, None, 0)
+
+    def remove_node(self, node):
+        """
+        Remove a node together with all edges from and to it
+
+        :param node: node
+        """
+        for head in list(self._out_edges[node]):
+            self.remove_edge(node, head)
+        for tail in list(self._in_edges[node]):
+            self.remove_edge(tail, node)
+
+        del self._out_edges[node]
+        del self._in_edges[node]
+        _shift(self._in_histogram, 0, None)
+        _shift(self._out_histogram, 0, None)
+
+    def add_edge(self, tail, head):
+        """
+        Add the edge tail -> head, adding missing nodes
+
+        :param tail: node the edge starts at
+        :param head: node the edge points to
+        """
+        self.add_node(tail)
+        self.add_node(head)
+
+        out_edges = self._out_edges[tail]
+        if head in out_edges:
+            return
+
+        in_edges = self._in_edges[head]
+        _shift(self._out_histogram, len(out_edges), len(out_edges) + 1)
+        _shift(self._in_histogram, len(in_edges), len(in_edges) + 1)
+        out_edges.add(head)
+        in_edges.add(tail)
+
+    def remove_edge(self, tail, head):
+        """
+        Remove the edge tail -> head, raising KeyError if there is no such edge
+
+        :param tail: node the edge starts at
+        :param head: node the edge points to
+        """
+        out_edges = self._out_edges[tail]
+        if head not in out_edges:
+            # fail before any counter changes
+            raise KeyError((tail, head))
+
+        in_edges = self._in_edges[head]
+        _shift(self._out_histogram, len(out_edges), len(out_edges) - 1)
+        _shift(self._in_histogram, len(in_edges), len(in_edges) - 1)
+        out_edges.remove(head)
+        in_edges.remove(tail)
+
+    def in_degree(self, node):
+        """
+        In-degree of a node
+
+        :rtype : int
+        """
+        return len(self._in_edges[node])
+
+    def out_degree(self, node):
+        """
+        Out-degree of a node
+
+        :rtype : int
+        """
+        return len(self._out_edges[node])
+
+    def in_degrees(self):
+        """
+        In-degree of every node
+
+        :rtype : dict
+        """
+        return dict((node, len(tails)) for node, tails in self._in_edges.iteritems())
+
+    def out_degrees(self):
+        """
+        Out-degree of every node
+
+        :rtype : dict
+        """
+        return dict((node, len(heads)) for node, heads in self._out_edges.iteritems())
+
+    def in_degree_distribution(self):
+        """
+        Number of nodes per in-degree
+
+        :rtype : dict
+        """
+        return dict(self._in_histogram)
+
+    def out_degree_distribution(self):
+        """
+        Number of nodes per out-degree
+
+        :rtype : dict
+        """
+        return dict(self._out_histogram)
+
+
+class _CompleteRow:
+    """
+    Neighbour set of a node of a CompleteGraph's complete part
+
+    The row is all complete-part nodes except the node itself, plus the explicit changes made to it afterwards.
+    Only those changes are stored, so a row costs O(1) memory until edges are added or removed.
+    """
+
+    def __init__(self, num_nodes, node):
+        """
+        Create the row of node in a complete graph of num_nodes nodes
+        """
+        self._num_nodes = num_nodes
+        self._node = node
+        self._added = set()
+        self._removed = set()
+
+    def _in_base(self, node):
+        """
+        Check if node is one of the row's implicit (complete graph) neighbours
+        """
+        return isinstance(node, (int, long)) and 0 <= node < self._num_nodes and node != self._node
+
+    def __len__(self):
+        return self._num_nodes - 1 - len(self._removed) + len(self._added)
+
+    def __contains__(self, node):
+        if self._in_base(node):
+            return node not in self._removed
+        return node in self._added
+
+    def __iter__(self):
+        for node in xrange(self._num_nodes):
+            if node != self._node and node not in self._removed:
+                yield node
+        for node in self._added:
+            yield node
+
+    def __eq__(self, other):
+        return set(self) == set(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(set(self))
+
+    def add(self, node):
+        """
+        Add a neighbour
+        """
+        if self._in_base(node):
+            self._removed.discard(node)
+        else:
+            self._added.add(node)
+
+    def discard(self, node):
+        """
+        Remove a neighbour if present
+        """
+        if self._in_base(node):
+            self._removed.add(node)
+        else:
+            self._added.discard(node)
+
+    def remove(self, node):
+        """
+        Remove a neighbour, raising KeyError if it is not present
+        """
+        if node not in self:
+            raise KeyError(node)
+        self.discard(node)
+
+
+class CompleteGraph:
+    """
+    Dictionary-like graph whose nodes 0..num_nodes-1 start out completely connected
+
+    The complete part is implicit: membership, iteration and degree (len) of its rows are answered arithmetically,
+    and a row only stores the edges added to or removed from it later. Nodes added afterwards (graph[node] = set(...))
+    are kept as ordinary sets. This takes O(n) memory for the complete part instead of O(n^2).
+    """
+
+    def __init__(self, num_nodes):
+        """
+        Create a complete graph with num_nodes nodes
+
+        :param num_nodes: number of nodes in the complete part
+        """
+        self._num_nodes = num_nodes
+
+        # rows of complete-part nodes handed out so far, and of nodes added later
+        self._complete_rows = {}
+        self._rows = {}
+
+        # complete-part nodes deleted from the graph (or moved to self._rows)
+        self._deleted = set()
+
+    def _in_complete_part(self, node):
+        """
+        Check if node is a (not deleted) node of the complete part
+        """
+        return isinstance(node, (int, long)) and 0 <= node < self._num_nodes and node not in self._deleted
+
+    def __len__(self):
+        return self._num_nodes - len(self._deleted) + len(self._rows)
+
+    def __contains__(self, node):
+        return node in self._rows or self._in_complete_part(node)
+
+    def __iter__(self):
+        for node in xrange(self._num_nodes):
+            if node not in self._deleted:
+                yield node
+        for node in self._rows:
+            yield node
+
+    def __getitem__(self, node):
+        if node in self._rows:
+            return self._rows[node]
+        if not self._in_complete_part(node):
+            raise KeyError(node)
+
+        row = self._complete_rows.get(node)
+        if row is None:
+            row = _CompleteRow(self._num_nodes, node)
+            self._complete_rows[node] = row
+        return row
+
+    def __setitem__(self, node, neighbours):
+        # an overwritten complete-part node leaves the complete part for good
+        if self._in_complete_part(node):
+            self._complete_rows.pop(node, None)
+            self._deleted.add(node)
+        self._rows[node] = neighbours
+
+    def __delitem__(self, node):
+        self.pop(node)
+
+    def __eq__(self, other):
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def pop(self, node):
+        """
+        Remove a node and return its neighbours
+
+        :param node: node
+        """
+        row = self[node]
+        if node in self._rows:
+            del self._rows[node]
+        else:
+            self._complete_rows.pop(node, None)
+            self._deleted.add(node)
+        return row
+
+    def get(self, node, default=None):
+        """
+        Get the neighbours of a node, or default if it is not in the graph
+        """
+        if node in self:
+            return self[node]
+        return default
+
+    def keys(self):
+        """
+        List of nodes
+
+        :rtype : list
+        """
+        return list(self)
+
+    def iteritems(self):
+        """
+        Iterate over (node, neighbours) pairs
+        """
+        for node in self:
+            yield node, self[node]
+
+    def items(self):
+        """
+        List of (node, neighbours) pairs
+
+        :rtype : list
+        """
+        return list(self.iteritems())
+
+    def itervalues(self):
+        """
+        Iterate over the neighbour sets
+        """
+        for node in self:
+            yield self[node]
+
+    def values(self):
+        """
+        List of neighbour sets
+
+        :rtype : list
+        """
+        return list(self.itervalues())
+
+    def to_dict(self):
+        """
+        Convert to an explicit dictionary-of-sets graph
+
+        :rtype : dict
+        """
+        return dict((node, set(self[node])) for node in self)
@@ -0,0 +1,110 @@
+"""
+Testing code for the degree-indexed Graph of module 1
+
+Run from the repository root:
+
+    python -m algorithmic_thinking.module1.graph_testsuite
+"""
+
+import random
+
+import simpletest
+
+from algorithmic_thinking.module1 import project
+from algorithmic_thinking.module1.graph import Graph
+
+
+def plain_copy(graph):
+    """
+    Copy a Graph into a plain dictionary-of-sets graph
+    """
+    return dict((node, set(graph[node])) for node in graph)
+
+
+def test_remove_missing_edge():
+    """
+    Removing an edge that does not exist raises KeyError and leaves the counters alone
+    """
+    suite = simpletest.TestSuite()
+
+    graph = Graph({0: set([1]), 1: set(), 2: set()})
+    expected_in = graph.in_degree_distribution()
+    expected_out = graph.out_degree_distribution()
+
+    try:
+        graph.remove_edge(1, 2)
+        raised = False
+    except KeyError:
+        raised = True
+
+    suite.run_test(raised, True, "Test #1: remove_edge(1, 2) on a missing edge")
+    suite.run_test(graph.in_degree_distribution(), expected_in, "Test #2: in-degree distribution after the failure")
+    suite.run_test(graph.out_degree_distribution(), expected_out,
+                   "Test #3: out-degree distribution after the failure")
+    suite.run_test(graph.in_degree(2), 0, "Test #4: in-degree of 2 after the failure")
+
+    suite.report_results()
+
+
+def test_random_updates(num_nodes=30, num_steps=3000, seed=7):
+    """
+    Interleave random node/edge additions and removals, some of them invalid, and compare the maintained
+    distributions with project's on a plain dictionary copy after every step
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(seed)
+
+    graph = Graph()
+    for step in xrange(num_steps):
+        action = rng.random()
+        tail = rng.randrange(num_nodes)
+        head = rng.randrange(num_nodes)
+
+        try:
+            if action < 0.45:
+                if tail != head:
+                    graph.add_edge(tail, head)
+            elif action < 0.85:
+                graph.remove_edge(tail, head)
+            elif action < 0.95:
+                graph.add_node(tail)
+            else:
+                graph.remove_node(tail)
+        except KeyError:
+            # missing edges and nodes are expected, the counters must not notice
+            pass
+
+        plain = plain_copy(graph)
+        message = "Step " + str(step) + ":"
+        suite.run_test(graph.in_degree_distribution(), project.in_degree_distribution(plain),
+                       message + " in-degree distribution")
+        suite.run_test(graph.in_degrees(), project.compute_in_degrees(plain), message + " in-degrees")
+        suite.run_test(graph.out_degrees(), project.compute_out_degrees(plain), message + " out-degrees")
+
+    suite.report_results()
+
+
+def test_snapshot_sizes():
+    """
+    dpa_distribution_snapshots refuses sizes below the seed graph and starts from the seed graph itself
+    """
+    suite = simpletest.TestSuite()
+
+    for sizes in [[2], [4, 3], [0]]:
+        try:
+            project.dpa_distribution_snapshots(sizes, 4)
+            raised = False
+        except ValueError:
+            raised = True
+        suite.run_test(raised, True, "Test #1: dpa_distribution_snapshots(" + str(sizes) + ", 4) raises ValueError")
+
+    snapshots = project.dpa_distribution_snapshots([4, 10], 4)
+    suite.run_test(snapshots[4], {3: 1.0}, "Test #2: the snapshot at the seed size is the complete graph")
+    suite.run_test(sorted(snapshots), [4, 10], "Test #3: one snapshot per size")
+
+    suite.report_results()
+
+
+test_remove_missing_edge()
+test_random_updates()
+test_snapshot_sizes()
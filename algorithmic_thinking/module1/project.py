@@ -3,8 +3,22 @@ Algorithmic Thinking - Module 1 Project
 """
 __author__ = 'mamaray'
 
+import math
 import random
+from array import array
+from itertools import izip
 import DPATrial as dpat
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module1.graph import Graph, CompleteGraph
+
+# numpy is optional, it only speeds up the statistics on compact graphs
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# generate_random_digraph skips over non-edges below this edge probability
+SPARSE_PROBABILITY = 0.1
 
 # Example graph objects
 EX_GRAPH0 = {0: set([1, 2]),
@@ -31,13 +45,16 @@ EX_GRAPH2 = {0: set([1, 4, 5]),
              9: set([0, 3, 4, 5, 6, 7])}
 
 
-def make_complete_graph(num_nodes):
+def make_complete_graph(num_nodes, lazy=False):
     """
     Return a graph object (dictionary) with all possible edges..
 
     :rtype : graph object (dictionary)
     :param num_nodes: number of nodes in the (complete) graph
+    :param lazy: return an implicit graph.CompleteGraph, which takes O(n) instead of O(n^2) memory
     """
+    if lazy:
+        return CompleteGraph(num_nodes)
 
     graph = {}
     tmp = range(num_nodes)
@@ -55,6 +72,14 @@ def compute_in_degrees(digraph):
     :rtype : dict
     :param digraph: input graph
     """
+    # degree-indexed graphs already know their in-degrees
+    if isinstance(digraph, Graph):
+        return digraph.in_degrees()
+
+    # compact graphs count in-degrees over their edge array
+    if isinstance(digraph, csr_graph.CSRGraph):
+        return dict(izip(digraph.labels(), digraph.in_degrees()))
+
     # initialize all in-degrees to 0
     in_degrees = {}.fromkeys(digraph.keys(), 0)
 
@@ -75,6 +100,14 @@ def compute_out_degrees(digraph):
     :rtype : dict
     :param digraph: input graph
     """
+    # degree-indexed graphs already know their out-degrees
+    if isinstance(digraph, Graph):
+        return digraph.out_degrees()
+
+    # compact graphs read out-degrees off their row offsets
+    if isinstance(digraph, csr_graph.CSRGraph):
+        return dict(izip(digraph.labels(), digraph.out_degrees()))
+
     # initialize all in-degrees to 0
     out_degrees = {}.fromkeys(digraph.keys(), 0)
 
@@ -92,6 +125,15 @@ def in_degree_distribution(digraph):
     :rtype : dict
     :param digraph: input graph
     """
+    # degree-indexed graphs keep the distribution up to date
+    if isinstance(digraph, Graph):
+        return digraph.in_degree_distribution()
+
+    # compact graphs go through the degree histogram
+    if isinstance(digraph, csr_graph.CSRGraph):
+        histogram = in_degree_histogram(digraph)
+        return dict((degree, int(count)) for degree, count in enumerate(histogram) if count)
+
     # local variables
     in_degree_graph = compute_in_degrees(digraph)
 
@@ -105,10 +147,53 @@ def in_degree_distribution(digraph):
     return in_degree_dist
 
 
+def in_degree_histogram(digraph, normalized=False):
+    """
+    Array form of the in-degree distribution: entry k is the number (or share, if normalized) of nodes with
+    in-degree k
+
+    On a csr_graph.CSRGraph with numpy installed this is two bincounts over the edge array, the first counting the
+    in-degree of every node and the second counting the degrees, so no per-edge Python loop runs.
+
+    :rtype : numpy.ndarray if numpy is installed, list otherwise
+    :param digraph: input graph
+    :param normalized: divide the counts by the number of nodes
+    """
+    num_nodes = len(digraph)
+
+    if numpy is not None and isinstance(digraph, csr_graph.CSRGraph):
+        targets = numpy.frombuffer(digraph.targets(), dtype=numpy.int32)
+        in_degrees = numpy.bincount(targets, minlength=num_nodes)
+        histogram = numpy.bincount(in_degrees)
+        if normalized:
+            return histogram / float(num_nodes)
+        return histogram
+
+    # count the degrees by hand
+    if isinstance(digraph, csr_graph.CSRGraph):
+        in_degrees = digraph.in_degrees()
+    else:
+        in_degrees = compute_in_degrees(digraph).values()
+
+    histogram = [0] * (max(in_degrees) + 1 if num_nodes else 0)
+    for degree in in_degrees:
+        histogram[degree] += 1
+
+    if normalized:
+        histogram = [float(count) / num_nodes for count in histogram]
+    if numpy is not None:
+        return numpy.array(histogram)
+    return histogram
+
+
 def generate_random_digraph(num_nodes, probability):
     """
     This function will generate a random graph based on a probability (ER graph)
 
+    Every ordered pair of distinct nodes becomes an edge independently with the given probability. Sparse graphs
+    (probability below SPARSE_PROBABILITY) are generated in O(n + m) by skipping over the non-edges, see
+    _sparse_random_digraph. Seed the random module for reproducible graphs.
+
     :rtype : dict
     :param num_nodes: number of nodes in the generated graph
     :param probability: probability of edge existing
@@ -118,13 +203,13 @@ def generate_random_digraph(num_nodes, probability):
     for itr in xrange(num_nodes):
         graph[itr] = set()
 
-    tracker = range(num_nodes)
+    if probability < SPARSE_PROBABILITY:
+        _sparse_random_digraph(graph, num_nodes, probability)
+        return graph
 
     # loop through each node
     for node_x in xrange(num_nodes):
-        tracker.remove(node_x)
-
-        for node_y in tracker:
+        for node_y in xrange(node_x + 1, num_nodes):
             rand = random.random()
             if rand < probability:
                 graph[node_x].add(node_y)
@@ -136,6 +221,38 @@ def generate_random_digraph(num_nodes, probability):
     return graph
 
 
+def _sparse_random_digraph(graph, num_nodes, probability):
+    """
+    Add ER edges to graph by geometric skip sampling (Batagelj & Brandes)
+
+    The n * (n - 1) ordered node pairs are numbered row by row. The gap between two consecutive edges in that order
+    is geometrically distributed, so one random number per edge is enough to jump straight to the next edge.
+
+    :param graph: graph with num_nodes nodes and no edges
+    :param num_nodes: number of nodes
+    :param probability: probability of edge existing
+    """
+    if probability <= 0:
+        return
+
+    row_size = num_nodes - 1
+    total_pairs = num_nodes * row_size
+    log_q = math.log(1.0 - probability)
+
+    pair = -1
+    while True:
+        # number of non-edges before the next edge
+        pair += 1 + int(math.log(1.0 - random.random()) / log_q)
+        if pair >= total_pairs:
+            return
+
+        # the row of node_x skips over node_x itself
+        node_x, node_y = divmod(pair, row_size)
+        if node_y >= node_x:
+            node_y += 1
+        graph[node_x].add(node_y)
+
+
 def normalize_in_degree_dist(digraph):
     """
     Takes a graph and returns a normalized distribution of each nodes in-degree
@@ -143,6 +260,16 @@ def normalize_in_degree_dist(digraph):
     :rtype : dict
     :param digraph: a dictionary representing a directed graph
     """
+    # degree-indexed graphs normalize their maintained distribution
+    if isinstance(digraph, Graph):
+        num_nodes = float(len(digraph))
+        return dict((degree, count / num_nodes) for degree, count in digraph.in_degree_distribution().iteritems())
+
+    # compact graphs go through the normalized degree histogram
+    if isinstance(digraph, csr_graph.CSRGraph):
+        histogram = in_degree_histogram(digraph, normalized=True)
+        return dict((degree, float(share)) for degree, share in enumerate(histogram) if share)
+
     idd = in_degree_distribution(digraph)
     total_sum = sum(idd.values())
 
@@ -153,18 +280,30 @@ def normalize_in_degree_dist(digraph):
     return norm_dist
 
 
-def dpa_graph(num_nodes, num_existing_nodes):
+def dpa_graph(num_nodes, num_existing_nodes, compact=False, lazy=False):
     """
     DPA algorithm implementation
 
-    :rtype : dict
+    With lazy the graph starts from an implicit complete graph (make_complete_graph(lazy=True)) and is returned as a
+    dictionary-like graph.CompleteGraph, whose complete-part rows are set-like views rather than sets. That only
+    saves the O(k^2) sets of the seed graph: DPATrial still keeps k entries per seed node.
+
+    With compact the trials run on DPATrial.CompactDPATrial and the graph is returned as a csr_graph.CSRGraph that
+    shares the trial's edge array, so memory stays at about 4 bytes per edge.
+
+    :rtype : dict (graph.CompleteGraph with lazy, csr_graph.CSRGraph with compact)
     :param num_nodes: final number of nodes
     :param num_existing_nodes: <= num_nodes, the number of existing nodes to which a new node is connected during each
                                 iteration
+    :param compact: return a CSRGraph built with the memory-bounded trial engine
+    :param lazy: start from an implicit complete graph
     :return: dictionary object representing a graph
     """
+    if compact:
+        return _compact_dpa_graph(num_nodes, num_existing_nodes)
+
     # First make a complete graph
-    graph = make_complete_graph(num_existing_nodes)
+    graph = make_complete_graph(num_existing_nodes, lazy=lazy)
 
     rand_nodes = dpat.DPATrial(num_existing_nodes)
 
@@ -174,3 +313,57 @@ def dpa_graph(num_nodes, num_existing_nodes):
         graph[new_nodes] = set(new_conns)
 
     return graph
+
+
+def dpa_distribution_snapshots(sizes, num_existing_nodes):
+    """
+    Grow one DPA graph and take its normalized in-degree distribution each time it reaches one of the given sizes
+
+    The graph is grown as a degree-indexed Graph, so each snapshot costs O(number of distinct degrees) instead of a
+    pass over the whole graph.
+
+    :rtype : dict
+    :param sizes: node counts to take snapshots at, none below num_existing_nodes (the size of the seed graph)
+    :param num_existing_nodes: the number of existing nodes to which a new node is connected
+    :return: dict of size -> normalized in-degree distribution
+    """
+    for size in sizes:
+        if size < num_existing_nodes:
+            raise ValueError("snapshot size %d is below the %d-node seed graph" % (size, num_existing_nodes))
+
+    graph = Graph(make_complete_graph(num_existing_nodes))
+    rand_nodes = dpat.DPATrial(num_existing_nodes)
+
+    snapshots = {}
+    for size in sorted(sizes):
+        # grow the graph up to the next snapshot size
+        for new_node in xrange(len(graph), size):
+            graph.add_node(new_node)
+            for neighbour in rand_nodes.run_trial(num_existing_nodes):
+                graph.add_edge(new_node, neighbour)
+
+        snapshots[size] = normalize_in_degree_dist(graph)
+
+    return snapshots
+
+
+def _compact_dpa_graph(num_nodes, num_existing_nodes):
+    """
+    dpa_graph as a CSRGraph, generated with CompactDPATrial
+
+    :rtype : csr_graph.CSRGraph
+    :param num_nodes: final number of nodes
+    :param num_existing_nodes: number of existing nodes to which a new node is connected
+    """
+    rand_nodes = dpat.CompactDPATrial(num_existing_nodes)
+
+    # rows of the complete graph all have num_existing_nodes - 1 entries
+    row_size = max(num_existing_nodes - 1, 0)
+    offsets = array(csr_graph.INDEX_TYPECODE, [node * row_size for node in xrange(num_existing_nodes + 1)])
+
+    # each trial appends the new node's row to the trial's edge array
+    for dummy_node in xrange(num_existing_nodes, num_nodes):
+        rand_nodes.run_trial(num_existing_nodes)
+        offsets.append(len(rand_nodes.targets()))
+
+    return csr_graph.CSRGraph(xrange(len(offsets) - 1), offsets, rand_nodes.targets())
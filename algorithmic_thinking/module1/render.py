@@ -0,0 +1,89 @@
+"""
+Headless batch rendering of the module 1 assignment plots
+
+    python -m algorithmic_thinking.module1.render [-o DIR] [-f png|svg] [q1 q2 q2_2 q3 q4 q5]
+
+Each question is drawn with the non-interactive Agg backend and written to DIR/<question>.<format>. matplotlib and
+the assignment code are only imported once the arguments are parsed, and the citation graph is parsed once and
+shared by every question.
+"""
+__author__ = 'mamaray'
+
+import os
+import argparse
+
+# questions that have an app_<question> function in assignment
+QUESTIONS = ["q1", "q2", "q2_2", "q3", "q4", "q5"]
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line
+
+    :rtype : argparse.Namespace
+    :param argv: argument list, defaults to sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description="Render module 1 assignment plots to image files")
+    parser.add_argument("questions", nargs="*", metavar="question",
+                        help="questions to run, any of " + " ".join(QUESTIONS) + " (default: all)")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory to write the images to")
+    parser.add_argument("-f", "--format", default="png", choices=["png", "svg"], help="image format")
+    args = parser.parse_args(argv)
+
+    for question in args.questions:
+        if question not in QUESTIONS:
+            parser.error("unknown question: " + question)
+    if not args.questions:
+        args.questions = list(QUESTIONS)
+
+    return args
+
+
+def render(questions, output_dir=".", image_format="png"):
+    """
+    Run the given questions and save each plot to a file
+
+    Questions that only print results (q3) do not produce a file.
+
+    :rtype : list
+    :param questions: question names, see QUESTIONS
+    :param output_dir: directory to write the images to
+    :param image_format: "png" or "svg"
+    :return: list of written file names
+    """
+    # pick the non-interactive backend before pyplot is imported anywhere
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from algorithmic_thinking.module1 import assignment
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    written = []
+    for question in questions:
+        figure = plt.figure(figsize=assignment.FIGURE_SIZE)
+        getattr(assignment, "app_" + question)()
+
+        if figure.get_axes():
+            filename = os.path.join(output_dir, question + "." + image_format)
+            figure.savefig(filename, format=image_format)
+            written.append(filename)
+        plt.close(figure)
+
+    return written
+
+
+def main(argv=None):
+    """
+    Command line entry point
+
+    :param argv: argument list, defaults to sys.argv[1:]
+    """
+    args = parse_args(argv)
+    for filename in render(args.questions, args.output_dir, args.format):
+        print filename
+
+
+if __name__ == "__main__":
+    main()
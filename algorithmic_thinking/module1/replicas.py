@@ -0,0 +1,116 @@
+"""
+Build many random graph replicas in parallel and aggregate their in-degree distributions
+"""
+__author__ = 'mamaray'
+
+import math
+import random
+import multiprocessing
+from algorithmic_thinking.module1 import project
+
+# z-score of the two-sided 95% normal confidence interval
+CONFIDENCE_Z = 1.96
+
+
+def replica_seeds(seed, num_replicas):
+    """
+    Derive one seed per replica from a base seed
+
+    Seeds belong to replicas, not to worker processes, so the results do not depend on the pool size.
+
+    :rtype : list
+    :param seed: base seed
+    :param num_replicas: number of replicas
+    """
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for dummy_idx in xrange(num_replicas)]
+
+
+def _replica_distribution(task):
+    """
+    Worker: build one replica and return only its in-degree distribution
+
+    :rtype : dict
+    :param task: (generator, generator arguments, seed) tuple
+    """
+    generator, args, seed = task
+
+    # with processes=1 this runs in the caller's process, whose random stream must not move
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        graph = generator(*args)
+    finally:
+        random.setstate(state)
+
+    return project.in_degree_distribution(graph)
+
+
+def aggregate_distributions(distributions, z_score=CONFIDENCE_Z):
+    """
+    Merge normalized in-degree distributions into a mean and a confidence band per degree
+
+    A degree missing from a distribution counts as a share of 0 for that replica.
+
+    :rtype : dict
+    :param distributions: list of in-degree distributions (degree -> number of nodes)
+    :param z_score: width of the band in standard errors
+    :return: dict of degree -> (mean, lower bound, upper bound) of the share of nodes with that degree
+    """
+    num_replicas = len(distributions)
+
+    # normalize every replica by its own node count
+    shares = []
+    for dist in distributions:
+        num_nodes = float(sum(dist.values()))
+        shares.append(dict((degree, count / num_nodes) for degree, count in dist.iteritems()))
+
+    degrees = set()
+    for share in shares:
+        degrees.update(share)
+
+    summary = {}
+    for degree in degrees:
+        values = [share.get(degree, 0.0) for share in shares]
+        mean = sum(values) / num_replicas
+
+        # sample standard error of the mean
+        if num_replicas > 1:
+            variance = sum((value - mean) ** 2 for value in values) / (num_replicas - 1)
+            margin = z_score * math.sqrt(variance / num_replicas)
+        else:
+            margin = 0.0
+
+        summary[degree] = (mean, mean - margin, mean + margin)
+
+    return summary
+
+
+def run_replicas(generator, args, num_replicas, seed=0, processes=None):
+    """
+    Build num_replicas independent graphs across a process pool and aggregate their in-degree distributions
+
+    Workers send back only their in-degree histograms, never whole graphs. With processes=1 everything runs in this
+    process.
+
+    :rtype : dict
+    :param generator: module-level graph generator, e.g. project.dpa_graph or project.generate_random_digraph
+    :param args: tuple of generator arguments, e.g. (27770, 13)
+    :param num_replicas: number of graphs to build
+    :param seed: base seed, see replica_seeds
+    :param processes: pool size, defaults to the number of CPUs
+    :return: dict of degree -> (mean, lower bound, upper bound), see aggregate_distributions
+    """
+    tasks = [(generator, tuple(args), replica_seed) for replica_seed in replica_seeds(seed, num_replicas)]
+
+    if processes == 1:
+        distributions = map(_replica_distribution, tasks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            distributions = pool.map(_replica_distribution, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return aggregate_distributions(distributions)
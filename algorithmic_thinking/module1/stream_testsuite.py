@@ -0,0 +1,160 @@
+"""
+Testing code for utils.stream_degree_distributions
+
+The streamed statistics are checked against in_degree_distribution(read_graph_data(filename)) on the graphs in
+graph_data and on random graphs, in array mode and, with small max_node_id / run_size / chunk_size, in spill mode
+(negative and large ids included). Run from the repository root:
+
+    python -m algorithmic_thinking.module1.stream_testsuite
+"""
+
+import os
+import random
+import tempfile
+
+import simpletest
+import graph_data
+
+import algorithmic_thinking.utils as utils
+from algorithmic_thinking.module1 import project
+
+GRAPHS = [(name, getattr(graph_data, name)) for name in sorted(dir(graph_data)) if name.startswith("GRAPH")
+          and all(isinstance(node, int) for node in getattr(graph_data, name))]
+
+# (max_node_id, run_size, chunk_size) settings: the defaults, then ones that spill early into many small runs
+SETTINGS = [(utils.MAX_NODE_ID, utils.RUN_SIZE, utils.CHUNK_SIZE), (64, 5, 7), (1, 1, 1)]
+
+
+def random_graph(rng, num_nodes, num_edges, low, high):
+    """
+    Random digraph with num_nodes distinct ids drawn from [low, high), every edge between two of them
+
+    :rtype : dict
+    """
+    nodes = rng.sample(xrange(low, high), num_nodes)
+    graph = dict((node, set()) for node in nodes)
+    for dummy_idx in xrange(num_edges):
+        graph[rng.choice(nodes)].add(rng.choice(nodes))
+    return graph
+
+
+def write_graph(graph, rng, dangling=()):
+    """
+    Write a graph to a temporary file in read_graph_data's format, rows in random order
+
+    :rtype : str
+    :param dangling: extra neighbours added to random rows, ids that have no row of their own
+    :return: file name, to be removed by the caller
+    """
+    rows = dict((node, list(neighbours)) for node, neighbours in graph.iteritems())
+    for entry in dangling:
+        rows[rng.choice(rows.keys())].append(entry)
+
+    nodes = rows.keys()
+    rng.shuffle(nodes)
+
+    handle, filename = tempfile.mkstemp(suffix=".txt")
+    data = os.fdopen(handle, "w")
+    for node in nodes:
+        data.write(" ".join(str(entry) for entry in [node] + rows[node]) + "\n")
+    data.close()
+    return filename
+
+
+def expected_stats(filename):
+    """
+    Statistics of a graph file computed from the dictionary graph read_graph_data builds
+
+    Edges to ids without a row are counted as edges but dropped for the in-degrees, as stream_degree_distributions
+    does.
+
+    :rtype : dict
+    """
+    graph = utils.read_graph_data(filename)
+    closed = dict((node, set(entry for entry in neighbours if entry in graph))
+                  for node, neighbours in graph.iteritems())
+    out_dist = {}
+    for neighbours in graph.itervalues():
+        out_dist[len(neighbours)] = out_dist.get(len(neighbours), 0) + 1
+
+    return {"num_nodes": len(graph), "num_edges": sum(len(neighbours) for neighbours in graph.itervalues()),
+            "in_degree_distribution": project.in_degree_distribution(closed), "out_degree_distribution": out_dist}
+
+
+def check_file(suite, filename, label):
+    """
+    Compare the streamed statistics of a file to the expected ones under every setting
+    """
+    expected = expected_stats(filename)
+    for max_node_id, run_size, chunk_size in SETTINGS:
+        computed = utils.stream_degree_distributions(filename, chunk_size=chunk_size, max_node_id=max_node_id,
+                                                     run_size=run_size)
+        suite.run_test(computed, expected, "%s, max_node_id=%d run_size=%d chunk_size=%d" % (
+            label, max_node_id, run_size, chunk_size))
+
+
+def test_graph_data():
+    """
+    Every integer graph of graph_data
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(0)
+
+    for name, graph in GRAPHS:
+        filename = write_graph(graph, rng)
+        try:
+            check_file(suite, filename, name)
+        finally:
+            os.remove(filename)
+
+    suite.report_results()
+
+
+def test_random_graphs():
+    """
+    Random graphs with small, negative, large and dangling ids
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(1)
+
+    cases = [("small ids", 0, 100, ()),
+             ("negative ids", -50, 50, ()),
+             ("negative only", -10 ** 6, 0, ()),
+             ("large ids", 0, 10 ** 9, ()),
+             ("dangling edges", -20, 80, (-1000, 500, 10 ** 7))]
+
+    for trial in xrange(5):
+        for label, low, high, dangling in cases:
+            graph = random_graph(rng, rng.randrange(1, 60), rng.randrange(0, 300), low, high)
+            filename = write_graph(graph, rng, dangling)
+            try:
+                check_file(suite, filename, "%s #%d" % (label, trial))
+            finally:
+                os.remove(filename)
+
+    suite.report_results()
+
+
+def test_empty_file():
+    """
+    A file without rows has no nodes and no edges
+    """
+    suite = simpletest.TestSuite()
+
+    handle, filename = tempfile.mkstemp(suffix=".txt")
+    os.fdopen(handle, "w").close()
+    try:
+        for max_node_id, run_size, chunk_size in SETTINGS:
+            computed = utils.stream_degree_distributions(filename, chunk_size=chunk_size, max_node_id=max_node_id,
+                                                         run_size=run_size)
+            suite.run_test(computed, {"num_nodes": 0, "num_edges": 0, "in_degree_distribution": {},
+                                      "out_degree_distribution": {}}, "empty file, max_node_id=%d" % max_node_id)
+    finally:
+        os.remove(filename)
+
+    suite.report_results()
+
+
+test_graph_data()
+test_random_graphs()
+test_empty_file()
@@ -5,6 +5,7 @@ Helper class for implementing efficient version of UPA algorithm
 """
 
 import random
+from array import array
 
 
 class UPATrial:
@@ -50,3 +51,86 @@ class UPATrial:
         # update the number of nodes
         self._num_nodes += 1
         return new_node_neighbors
+
+
+class CompactUPATrial:
+    """
+    Memory-bounded alternative to UPATrial with the same node probabilities
+
+    UPATrial's list holds degree + 1 entries per node, so it grows with the number of edges. This class keeps the
+    weight (degree + 1) of every node in a Fenwick tree: one C long per node, allocated up front for the final number
+    of nodes, so memory depends on the number of nodes only. A trial walks down the tree to find the node a draw lands
+    on, O(log n) per draw.
+    """
+
+    def __init__(self, num_nodes, capacity):
+        """
+        Initialize a CompactUPATrial object corresponding to a complete graph with num_nodes nodes
+
+        :param num_nodes: number of nodes of the initial complete graph
+        :param capacity: largest number of nodes the graph will reach
+        """
+        self._num_nodes = num_nodes
+        self._total = 0
+        self._tree = array('l', [0]) * (capacity + 1)
+
+        # largest power of two within the tree, where the descent starts
+        self._top = 1
+        while self._top * 2 <= capacity:
+            self._top *= 2
+
+        # every node of the complete graph has degree num_nodes - 1
+        for node in xrange(num_nodes):
+            self._add(node, num_nodes)
+
+    def _add(self, node, weight):
+        """
+        Add weight to a node
+        """
+        tree = self._tree
+        idx = node + 1
+        while idx < len(tree):
+            tree[idx] += weight
+            idx += idx & -idx
+        self._total += weight
+
+    def _find(self, draw):
+        """
+        Get the node whose share of the total weight contains draw, 0 <= draw < total weight
+        """
+        tree = self._tree
+        node = 0
+        step = self._top
+        while step:
+            idx = node + step
+            if idx < len(tree) and tree[idx] <= draw:
+                node = idx
+                draw -= tree[idx]
+            step >>= 1
+        return node
+
+    def run_trial(self, num_nodes):
+        """
+        Conduct num_nodes trials, each picking a node with probability proportional to its degree + 1
+
+        Updates the weights so the new node and its neighbours get their share of later trials
+
+        Returns: Set of nodes
+        """
+        if self._num_nodes + 1 >= len(self._tree):
+            raise ValueError("capacity of %d nodes reached" % (len(self._tree) - 1))
+
+        # compute the neighbors for the newly-created node
+        total = self._total
+        new_node_neighbors = set()
+        for dummy_idx in xrange(num_nodes):
+            new_node_neighbors.add(self._find(int(random.random() * total)))
+
+        # every neighbour gains one degree, the new node starts at degree + 1
+        for node in new_node_neighbors:
+            self._add(node, 1)
+        self._add(self._num_nodes, len(new_node_neighbors) + 1)
+
+        # update the number of nodes
+        self._num_nodes += 1
+        return new_node_neighbors
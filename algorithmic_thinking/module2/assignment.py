@@ -3,14 +3,31 @@ assignment portion of algorithmic thinking - module 2
 """
 __author__ = 'ray'
 
+import os
 import random
 import UPATrial
+from array import array
 import algorithmic_thinking.utils as utils
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking import datasets
 import algorithmic_thinking.module1.project as m1project
 import algorithmic_thinking.module2.project as m2project
 from algorithmic_thinking.module2 import provided
+from algorithmic_thinking.module2.overlay import RemovalOverlay
 import matplotlib.pyplot as plt
 
+# computer network data, next to this file
+NETWORK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alg_rf7.txt")
+
+# seed the comparison graphs are generated with
+DATASET_SEED = 0
+
+# undirected edges per chunk when streaming generated graphs
+EDGE_CHUNK_SIZE = 1 << 16
+
+_net_g = None
+_parameters = None
+
 
 def generate_random_ugraph(num_nodes, probability):
     """
@@ -39,18 +56,27 @@ def generate_random_ugraph(num_nodes, probability):
     return graph
 
 
-def upa_graph(num_nodes, num_existing_nodes):
+def upa_graph(num_nodes, num_existing_nodes, compact=False, lazy=False):
     """
     UPA algorithm implementation
 
-    :rtype : dict
+    With lazy the graph starts from an implicit complete graph (make_complete_graph(lazy=True)) and is returned as a
+    dictionary-like graph.CompleteGraph, whose complete-part rows are set-like views rather than sets. That only
+    saves the O(k^2) sets of the seed graph: UPATrial still keeps k entries per seed node.
+
+    :rtype : dict (graph.CompleteGraph with lazy, csr_graph.CSRGraph with compact)
     :param num_nodes: final number of nodes
     :param num_existing_nodes: <= num_nodes, the number of existing nodes to which a new node is connected
                                 during each iteration
+    :param compact: build a csr_graph.CSRGraph from streamed edges (see upa_edge_chunks) instead of a dictionary
+    :param lazy: start from an implicit complete graph
     :return: dictionary object representing a graph
     """
+    if compact:
+        return csr_graph.from_edges(num_nodes, upa_edge_chunks(num_nodes, num_existing_nodes))
+
     # First make a complete graph
-    graph = m1project.make_complete_graph(num_existing_nodes)
+    graph = m1project.make_complete_graph(num_existing_nodes, lazy=lazy)
 
     rand_nodes = UPATrial.UPATrial(num_existing_nodes)
 
@@ -69,6 +95,71 @@ def upa_graph(num_nodes, num_existing_nodes):
     return graph
 
 
+def upa_edge_chunks(num_nodes, num_existing_nodes, chunk_size=EDGE_CHUNK_SIZE):
+    """
+    Generate a UPA graph as a stream of undirected edges
+
+    Nodes are sampled with UPATrial.CompactUPATrial, so apart from the chunk being filled the generator only needs
+    memory proportional to the number of nodes. Every edge is listed once, as (newer node, older node).
+
+    :param num_nodes: final number of nodes
+    :param num_existing_nodes: <= num_nodes, the number of existing nodes to which a new node is connected
+                                during each iteration
+    :param chunk_size: number of edges per chunk (the last edges of a node may overflow it a little)
+    :return: generator of int32 arrays of flattened (node, neighbour) pairs
+    """
+    chunk = array(csr_graph.INDEX_TYPECODE)
+
+    # edges of the initial complete graph
+    for node in xrange(num_existing_nodes):
+        for neighbour in xrange(node):
+            chunk.append(node)
+            chunk.append(neighbour)
+        if len(chunk) >= 2 * chunk_size:
+            yield chunk
+            chunk = array(csr_graph.INDEX_TYPECODE)
+
+    rand_nodes = UPATrial.CompactUPATrial(num_existing_nodes, num_nodes)
+
+    # iterate through the remaining nodes
+    for new_node in xrange(num_existing_nodes, num_nodes):
+        for neighbour in rand_nodes.run_trial(num_existing_nodes):
+            chunk.append(new_node)
+            chunk.append(neighbour)
+        if len(chunk) >= 2 * chunk_size:
+            yield chunk
+            chunk = array(csr_graph.INDEX_TYPECODE)
+
+    if chunk:
+        yield chunk
+
+
+def write_upa_edges(filename, num_nodes, num_existing_nodes, chunk_size=EDGE_CHUNK_SIZE):
+    """
+    Generate a UPA graph straight into a binary edge file, chunk by chunk
+
+    The file holds native int32 (node, neighbour) pairs, see csr_graph.read_edge_file to load it as a graph.
+
+    :rtype : int
+    :param filename: file to write
+    :param num_nodes: final number of nodes
+    :param num_existing_nodes: <= num_nodes, the number of existing nodes to which a new node is connected
+                                during each iteration
+    :param chunk_size: number of edges written at a time
+    :return: number of edges written
+    """
+    num_edges = 0
+    edge_file = open(filename, "wb")
+    try:
+        for chunk in upa_edge_chunks(num_nodes, num_existing_nodes, chunk_size):
+            chunk.tofile(edge_file)
+            num_edges += len(chunk) // 2
+    finally:
+        edge_file.close()
+
+    return num_edges
+
+
 def random_order(graph):
     """
     that takes a graph and returns a list of the nodes in the graph in some random order
@@ -90,21 +181,26 @@ def fast_targeted_order(graph):
     Compute a targeted attack order consisting of nodes of maximal degree
 
     :rtype : list
-    :param ugraph: input graph
+    :param ugraph: input graph (dictionary, csr_graph.CSRGraph or overlay.RemovalOverlay); a dictionary is converted
+                   to a CSRGraph first, so callers attacking one graph several times should pass its CSRGraph
     """
-    # copy graph
-    graph = provided.copy_graph(graph)
+    # overlay the graph instead of copying it
+    nodes = graph.keys()
+    overlay = RemovalOverlay(graph)
+    base_graph = overlay.graph()
+    labels = base_graph.labels()
+    degrees = overlay.degrees()
 
     # initialize return variable
     attack_order = []
 
     # initialize array
     degree_sets = {}
-    for itr in xrange(len(graph)):
+    for itr in xrange(len(overlay)):
         degree_sets[itr] = set()
 
-    for idx in graph:
-        degree_sets[len(graph[idx])].add(idx)
+    for idx in nodes:
+        degree_sets[degrees[base_graph.node_index(idx)]].add(idx)
 
     rev_degrees = degree_sets.keys()
     rev_degrees.reverse()
@@ -112,16 +208,17 @@ def fast_targeted_order(graph):
         while degree_sets[idx]:
 
             u = degree_sets[idx].pop()
+            u_idx = base_graph.node_index(u)
 
-            for neighbour in graph[u]:
-                d = len(graph[neighbour])
+            for neighbour in overlay.live_neighbours(u_idx):
+                d = degrees[neighbour]
 
-                degree_sets[d].remove(neighbour)
-                degree_sets[d - 1].add(neighbour)
+                degree_sets[d].remove(labels[neighbour])
+                degree_sets[d - 1].add(labels[neighbour])
 
             attack_order.append(u)
 
-            provided.delete_node(graph, u)
+            overlay.delete_index(u_idx)
 
     return attack_order
 
@@ -129,27 +226,69 @@ def fast_targeted_order(graph):
 # print fast_targeted_order(gd.GRAPH2)
 # quit()
 
-"""
-generate graph data for use in the questions
-"""
-# get the network graph
-net_g = utils.read_graph_data("alg_rf7.txt")
 
-# generate a upa graph with the given average out-degree
-total_out_degrees = sum(m1project.compute_out_degrees(net_g).values())
-average_degree = float(total_out_degrees) / len(net_g) / 2
-m = int(round(average_degree))
-upa_g = upa_graph(len(net_g), m)
+def network_graph():
+    """
+    Get the computer network graph, parsed once and shared by all questions
+
+    The graph stays compact, so a cache hit is just the load of the binary sidecar file.
+
+    :rtype : csr_graph.CSRGraph
+    """
+    global _net_g
+    if _net_g is None:
+        _net_g = utils.read_graph_data(NETWORK_FILE, compact=True, cache=True)
+    return _net_g
+
+
+def model_parameters():
+    """
+    Get the UPA m and ER p that give graphs with the same number of edges as the computer network
+
+    :rtype : tuple
+    :return: (m, p)
+    """
+    global _parameters
+    if _parameters is None:
+        graph = network_graph()
+
+        # generate a upa graph with the given average out-degree
+        total_out_degrees = sum(m1project.compute_out_degrees(graph).values())
+        average_degree = float(total_out_degrees) / len(graph) / 2
+        m = int(round(average_degree))
+
+        # create an ER ugraph
+        network_size = len(graph)
+        total_possible_edges = (network_size * (network_size - 1)) / 2
+        p = total_out_degrees / float(total_possible_edges) / 2
+
+        _parameters = m, p
+    return _parameters
 
-# create an ER ugraph
-network_size = len(net_g)
-total_possible_edges = (network_size * (network_size - 1)) / 2
-p = total_out_degrees / float(total_possible_edges) / 2
-er_g = generate_random_ugraph(len(net_g), p)
 
-# utils.print_graph_data(net_g, name="net_g")
-# utils.print_graph_data(upa_g, name="upa_g")
-# utils.print_graph_data(er_g, name="er_g")
+def upa_dataset(seed=DATASET_SEED):
+    """
+    Get the UPA graph the size of the computer network, built (or loaded) on first use
+
+    :rtype : csr_graph.CSRGraph
+    :param seed: random seed
+    """
+    return datasets.dataset(upa_graph, (len(network_graph()), model_parameters()[0]), seed)
+
+
+def er_dataset(seed=DATASET_SEED):
+    """
+    Get the ER ugraph the size of the computer network, built (or loaded) on first use
+
+    :rtype : csr_graph.CSRGraph
+    :param seed: random seed
+    """
+    return datasets.dataset(generate_random_ugraph, (len(network_graph()), model_parameters()[1]), seed)
+
+
+# utils.print_graph_data(network_graph(), name="net_g")
+# utils.print_graph_data(upa_dataset(), name="upa_g")
+# utils.print_graph_data(er_dataset(), name="er_g")
 
 
 def q1_q2():
@@ -158,6 +297,11 @@ def q1_q2():
     then compare the resilience of the network to the resilience of ER and UPA graphs of similar size
     :return:
     """
+    net_g = network_graph()
+    upa_g = upa_dataset()
+    er_g = er_dataset()
+    m, p = model_parameters()
+
     # compute the resiliency of each graph
     attack_order = random_order(net_g)
     net_g_r = m2project.compute_resilience(net_g, attack_order)
@@ -203,7 +347,12 @@ def q4_q5():
     then compare the resilience of the network to the resilience of ER and UPA graphs of similar size
     :return:
     """
-    # compute the resiliency of each graph
+    net_g = network_graph()
+    upa_g = upa_dataset()
+    er_g = er_dataset()
+    m, p = model_parameters()
+
+    # compute the resiliency of each graph, the attack and the resilience share each compact graph
     attack_order = fast_targeted_order(net_g)
     net_g_r = m2project.compute_resilience(net_g, attack_order)
 
@@ -248,15 +397,15 @@ def q3():
     slow = []
     fast = []
 
+    # both attacks run on the same compact graph, built once per size
     for n in range(10, 1000, 10):
-        upa_g = upa_graph(n, 5)
+        upa_g = upa_graph(n, 5, compact=True)
+
         s = time.time()
         attack_order = provided.targeted_order(upa_g)
         e = time.time()
         slow.append(e - s)
 
-    for n in range(10, 1000, 10):
-        upa_g = upa_graph(n, 5)
         s = time.time()
         attack_order = fast_targeted_order(upa_g)
         e = time.time()
@@ -271,4 +420,5 @@ def q3():
     plt.show()
 
 
-q3()
\ No newline at end of file
+if __name__ == "__main__":
+    q3()
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Sampled betweenness estimates and adaptive betweenness attack orders
+"""
+__author__ = 'mamaray'
+
+import heapq
+import random
+from array import array
+from collections import deque
+from algorithmic_thinking.module2.overlay import RemovalOverlay
+
+# number of sampled BFS sources used when none is given
+SAMPLE_SOURCES = 32
+
+
+def _source_pass(offsets, targets, removed, source):
+    """
+    Brandes' single-source pass over the remaining nodes
+
+    :rtype : tuple
+    :param offsets: CSR row offsets
+    :param targets: CSR neighbour array
+    :param removed: bytearray of removal flags
+    :param source: dense id of the source
+    :return: (dist, sigma, delta) dicts over every node reached from source: hop distance, number of shortest paths
+             and the dependency of source on the node (0 for source itself)
+    """
+    dist = {source: 0}
+    sigma = {source: 1}
+    found = [source]
+
+    # breadth-first search, counting shortest paths; found ends up in order of distance
+    queue = deque()
+    queue.append(source)
+    while queue:
+        node = queue.popleft()
+        next_dist = dist[node] + 1
+        paths = sigma[node]
+        for neighbour in targets[offsets[node]:offsets[node + 1]]:
+            if removed[neighbour]:
+                continue
+            if neighbour not in dist:
+                dist[neighbour] = next_dist
+                sigma[neighbour] = 0
+                found.append(neighbour)
+                queue.append(neighbour)
+            if dist[neighbour] == next_dist:
+                sigma[neighbour] += paths
+
+    # accumulate the dependencies back from the farthest nodes
+    delta = dict.fromkeys(found, 0.0)
+    for node in reversed(found):
+        node_dist = dist[node] - 1
+        coefficient = (1.0 + delta[node]) / sigma[node]
+        for neighbour in targets[offsets[node]:offsets[node + 1]]:
+            if not removed[neighbour] and dist.get(neighbour) == node_dist:
+                delta[neighbour] += sigma[neighbour] * coefficient
+    delta[source] = 0.0
+
+    return dist, sigma, delta
+
+
+def _repair_pass(offsets, targets, removed, source, source_pass, node):
+    """
+    Update a source's pass after a node it reached was removed, redoing only the part of it that changed
+
+    Only the nodes below the removed one in the source's shortest-path DAG (its descendants) can lose distance or
+    paths: their distances are searched again from the unchanged nodes around them and their path counts are
+    recounted. Dependencies change for those nodes and for their ancestors (old and new), which are recomputed
+    from their successors, farthest first. Everything else in the pass is left alone.
+
+    :rtype : dict
+    :param offsets: CSR row offsets
+    :param targets: CSR neighbour array
+    :param removed: bytearray of removal flags, with node already flagged
+    :param source: dense id of the source, not node
+    :param source_pass: (dist, sigma, delta) of the source from _source_pass, updated in place
+    :param node: dense id of the removed node
+    :return: dict of node -> previous dependency for every node whose dependency may have changed
+    """
+    dist, sigma, delta = source_pass
+
+    # descendants of the removed node in the old shortest-path DAG
+    below = {}
+    level = [node]
+    while level:
+        next_level = []
+        for parent in level:
+            child_dist = dist[parent] + 1
+            for child in targets[offsets[parent]:offsets[parent + 1]]:
+                if not removed[child] and child not in below and dist.get(child) == child_dist:
+                    below[child] = child_dist
+                    next_level.append(child)
+        level = next_level
+
+    changed = dict((member, delta[member]) for member in below)
+    changed[node] = delta[node]
+    node_dist = dist[node]
+    del dist[node], sigma[node], delta[node]
+    for member in below:
+        del dist[member], sigma[member]
+
+    # new distances below: unit-weight search that starts from the unchanged nodes bordering the region
+    buckets = {}
+    for member in below:
+        best = None
+        for neighbour in targets[offsets[member]:offsets[member + 1]]:
+            if not removed[neighbour] and neighbour in dist and (best is None or dist[neighbour] < best):
+                best = dist[neighbour]
+        if best is not None:
+            buckets.setdefault(best + 1, []).append(member)
+
+    reached = []
+    while buckets:
+        level_dist = min(buckets)
+        for member in buckets.pop(level_dist):
+            if member in dist:
+                continue
+            dist[member] = level_dist
+            reached.append(member)
+            for neighbour in targets[offsets[member]:offsets[member + 1]]:
+                if neighbour in below and neighbour not in dist:
+                    buckets.setdefault(level_dist + 1, []).append(neighbour)
+
+    # new path counts below, nearest first
+    for member in reached:
+        prev_dist = dist[member] - 1
+        sigma[member] = sum(sigma[neighbour] for neighbour in targets[offsets[member]:offsets[member + 1]]
+                            if not removed[neighbour] and dist.get(neighbour) == prev_dist)
+    for member in below:
+        if member not in dist:
+            del delta[member]
+
+    # ancestors, old or new, of the region: their dependencies include targets in it
+    level = [(node, node_dist)]
+    level.extend(below.iteritems())
+    level.extend((member, dist[member]) for member in reached)
+    ancestors = set()
+    while level:
+        next_level = []
+        for child, child_dist in level:
+            for parent in targets[offsets[child]:offsets[child + 1]]:
+                if (not removed[parent] and parent not in below and parent not in ancestors
+                        and dist.get(parent) == child_dist - 1):
+                    ancestors.add(parent)
+                    next_level.append((parent, child_dist - 1))
+        level = next_level
+
+    # recompute the dependencies of the region and its ancestors from their successors, farthest first
+    for ancestor in ancestors:
+        changed[ancestor] = delta[ancestor]
+    for member in sorted(ancestors.union(reached), key=dist.__getitem__, reverse=True):
+        member_dist = dist[member] + 1
+        paths = float(sigma[member])
+        total = 0.0
+        for child in targets[offsets[member]:offsets[member + 1]]:
+            if not removed[child] and dist.get(child) == member_dist:
+                total += paths / sigma[child] * (1.0 + delta[child])
+        delta[member] = total
+    delta[source] = 0.0
+
+    return changed
+
+
+def _pick_source(rng, removed, sources, num_live):
+    """
+    Draw a remaining node that is not a source yet, or None if there is none
+    """
+    num_nodes = len(removed)
+    taken = set(sources)
+    if num_live <= len(taken):
+        return None
+
+    # rejection sampling while remaining nodes are common, a scan once they are rare
+    for dummy_idx in xrange(16):
+        idx = rng.randrange(num_nodes)
+        if not removed[idx] and idx not in taken:
+            return idx
+
+    candidates = [idx for idx in xrange(num_nodes) if not removed[idx] and idx not in taken]
+    if not candidates:
+        return None
+    return rng.choice(candidates)
+
+
+def betweenness_estimates(ugraph, num_sources=SAMPLE_SOURCES, seed=0):
+    """
+    Estimate the betweenness of every node from a sample of BFS sources (Brandes & Pich)
+
+    Dependencies are summed over the sampled sources and scaled by n / num_sources, so with every node as a source
+    this is the exact betweenness (counting each unordered pair twice).
+
+    :rtype : dict
+    :param ugraph: undirected graph (dictionary, csr_graph.CSRGraph or RemovalOverlay)
+    :param num_sources: number of sampled sources
+    :param seed: seed for sampling the sources
+    :return: dict of node -> estimated betweenness
+    """
+    overlay = ugraph if isinstance(ugraph, RemovalOverlay) else RemovalOverlay(ugraph)
+    graph = overlay.graph()
+    offsets = graph.offsets()
+    targets = graph.targets()
+    removed = overlay.removed()
+
+    live = [idx for idx in xrange(graph.num_nodes()) if not removed[idx]]
+    sources = random.Random(seed).sample(live, min(num_sources, len(live)))
+
+    scores = dict.fromkeys(live, 0.0)
+    for source in sources:
+        for idx, value in _source_pass(offsets, targets, removed, source)[2].iteritems():
+            scores[idx] += value
+
+    scale = float(len(live)) / len(sources) if sources else 0.0
+    labels = graph.labels()
+    return dict((labels[idx], value * scale) for idx, value in scores.iteritems())
+
+
+def betweenness_order(ugraph, num_sources=SAMPLE_SOURCES, seed=0):
+    """
+    Compute an adaptive attack order that always removes the node of highest estimated betweenness
+
+    The estimate sums the dependencies of num_sources sampled sources, kept per source. After a removal only the
+    sources that reached the removed node are touched, the others cannot see it. For those, only the region of the
+    source's shortest-path DAG below the removed node is searched again, and only that region and its ancestors get
+    their dependencies recomputed (see _repair_pass); a removal far out in the DAG costs little, one near the source
+    still touches much of the component. A removed source is replaced by a fresh sample, searched in full. The best
+    node is kept in a heap with lazy deletion, ties go to the lowest dense id.
+
+    :rtype : list
+    :param ugraph: undirected graph (dictionary or csr_graph.CSRGraph)
+    :param num_sources: number of sampled sources
+    :param seed: seed for sampling the sources
+    :return: list of nodes
+    """
+    overlay = RemovalOverlay(ugraph)
+    graph = overlay.graph()
+    offsets = graph.offsets()
+    targets = graph.targets()
+    removed = overlay.removed()
+    labels = graph.labels()
+    num_nodes = graph.num_nodes()
+
+    rng = random.Random(seed)
+    sources = rng.sample(xrange(num_nodes), min(num_sources, num_nodes))
+    passes = [_source_pass(offsets, targets, removed, source) for source in sources]
+
+    scores = array('d', [0.0]) * num_nodes
+    for dummy_dist, dummy_sigma, delta in passes:
+        for idx, value in delta.iteritems():
+            scores[idx] += value
+
+    heap = [(-scores[idx], idx) for idx in xrange(num_nodes)]
+    heapq.heapify(heap)
+
+    attack_order = []
+    while heap:
+        score, idx = heapq.heappop(heap)
+        if removed[idx] or -score != scores[idx]:
+            # stale entry
+            continue
+
+        attack_order.append(labels[idx])
+
+        # only sources that reached the node can see the removal
+        affected = [slot for slot in xrange(len(sources)) if idx in passes[slot][0]]
+        overlay.delete_index(idx)
+
+        touched = set()
+        for slot in affected:
+            if sources[slot] != idx:
+                delta = passes[slot][2]
+                for node, value in _repair_pass(offsets, targets, removed, sources[slot], passes[slot],
+                                                idx).iteritems():
+                    scores[node] += delta.get(node, 0.0) - value
+                    touched.add(node)
+                continue
+
+            # the source itself is gone, a new one is sampled and searched from scratch
+            for node, value in passes[slot][2].iteritems():
+                scores[node] -= value
+                touched.add(node)
+
+            sources[slot] = _pick_source(rng, removed, sources, len(overlay))
+            if sources[slot] is None:
+                passes[slot] = ({}, {}, {})
+                continue
+
+            passes[slot] = _source_pass(offsets, targets, removed, sources[slot])
+            for node, value in passes[slot][2].iteritems():
+                scores[node] += value
+                touched.add(node)
+
+        scores[idx] = 0.0
+        for node in touched:
+            if not removed[node]:
+                heapq.heappush(heap, (-scores[node], node))
+
+        # drop exhausted sources
+        keep = [slot for slot in xrange(len(sources)) if sources[slot] is not None]
+        sources = [sources[slot] for slot in keep]
+        passes = [passes[slot] for slot in keep]
+
+    return attack_order
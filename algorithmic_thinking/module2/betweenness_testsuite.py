@@ -0,0 +1,128 @@
+"""
+Testing code for the sampled betweenness estimates and attack orders of module 2
+
+With every node as a source the estimates must equal the exact betweenness, here computed by brute force from
+all-pairs shortest path counts, and every adaptive pick must be a node of highest exact betweenness in the graph that
+is left. Run from the repository root:
+
+    python -m algorithmic_thinking.module2.betweenness_testsuite
+"""
+
+import random
+
+import simpletest
+import graph_fixtures
+
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module2 import betweenness as student
+
+# allowed difference between float sums taken in a different order
+TOLERANCE = 1e-9
+
+
+def test_graphs():
+    """
+    graph_data graphs plus a few seeded random ER graphs
+
+    :rtype : list
+    :return: list of (name, graph) pairs
+    """
+    return graph_fixtures.fixture_graphs(30, [0.05, 0.1, 0.2])
+
+
+def exact_betweenness(ugraph):
+    """
+    Betweenness of every node over ordered pairs: sum of sigma(s, v) * sigma(v, t) / sigma(s, t) over all s, t with
+    v on a shortest s-t path
+    """
+    counts = dict((node, graph_fixtures.search(ugraph, node)) for node in ugraph)
+    scores = dict.fromkeys(ugraph, 0.0)
+    for source in ugraph:
+        dist_s, sigma_s = counts[source]
+        for target in dist_s:
+            if target == source:
+                continue
+            for node in ugraph:
+                if node == source or node == target or node not in dist_s:
+                    continue
+                dist_v, sigma_v = counts[node]
+                if target in dist_v and dist_s[node] + dist_v[target] == dist_s[target]:
+                    scores[node] += float(sigma_s[node]) * sigma_v[target] / sigma_s[target]
+    return scores
+
+
+def close(computed, expected):
+    """
+    Check if two dicts of scores have the same keys and values within TOLERANCE
+    """
+    return (set(computed) == set(expected)
+            and all(abs(computed[node] - expected[node]) <= TOLERANCE for node in expected))
+
+
+def test_estimates():
+    """
+    betweenness_estimates with every node as a source against the exact betweenness
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        estimates = student.betweenness_estimates(ugraph, num_sources=len(ugraph))
+        suite.run_test(close(estimates, exact_betweenness(ugraph)), True,
+                       "Testing betweenness_estimates on " + name + " with every source:")
+
+    suite.report_results()
+
+
+def test_adaptive_picks():
+    """
+    With every node as a source, every pick of betweenness_order has the highest exact betweenness left
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        order = student.betweenness_order(ugraph, num_sources=len(ugraph))
+        suite.run_test(sorted(order), sorted(ugraph), "Testing betweenness_order on " + name + ": every node once")
+
+        remaining = dict((node, set(ugraph[node])) for node in ugraph)
+        for step, node in enumerate(order):
+            scores = exact_betweenness(remaining)
+            suite.run_test(scores[node] >= max(scores.values()) - TOLERANCE, True,
+                           "Testing betweenness_order on " + name + ": pick " + str(step) + " is a maximum")
+            for neighbour in remaining.pop(node):
+                remaining[neighbour].discard(node)
+
+    suite.report_results()
+
+
+def test_repair_pass():
+    """
+    A source pass repaired after each of a series of removals equals a fresh pass on the remaining graph
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(5)
+
+    for name, ugraph in test_graphs():
+        graph = csr_graph.from_dict(ugraph)
+        offsets = graph.offsets()
+        targets = graph.targets()
+        removed = bytearray(graph.num_nodes())
+
+        source = rng.randrange(graph.num_nodes())
+        source_pass = student._source_pass(offsets, targets, removed, source)
+        victims = [idx for idx in xrange(graph.num_nodes()) if idx != source]
+        rng.shuffle(victims)
+
+        for idx in victims:
+            removed[idx] = 1
+            if idx in source_pass[0]:
+                student._repair_pass(offsets, targets, removed, source, source_pass, idx)
+            dist, sigma, delta = student._source_pass(offsets, targets, removed, source)
+            suite.run_test((source_pass[0], source_pass[1], close(source_pass[2], delta)), (dist, sigma, True),
+                           "Testing _repair_pass on " + name + " after removing " + str(idx) + ":")
+
+    suite.report_results()
+
+
+test_estimates()
+test_adaptive_picks()
+test_repair_pass()
@@ -0,0 +1,128 @@
+"""
+Articulation points, bridges and biconnected components of undirected graphs
+"""
+__author__ = 'mamaray'
+
+from array import array
+from algorithmic_thinking import csr_graph
+
+
+def biconnected_decomposition(ugraph):
+    """
+    Find the articulation points, bridges and biconnected components of a graph in one O(n + m) pass
+
+    Tarjan's depth-first search with low-link values, run with an explicit stack (no recursion limit) over the dense
+    ids of a csr_graph.CSRGraph. Tree and back edges are pushed on an edge stack and popped off as a biconnected
+    component whenever a child cannot reach above its parent. Isolated nodes belong to no component.
+
+    Articulation points are the nodes that belong to more than one component; they are ordered by that number,
+    highest first, so the nodes whose removal splits the graph into the most pieces come first.
+
+    :rtype : tuple
+    :param ugraph: undirected graph (dictionary or csr_graph.CSRGraph)
+    :return: (articulation points, bridges, component sizes) where bridges is a list of (node, node) pairs and
+             component sizes is a list with the number of nodes in each biconnected component
+    """
+    graph = csr_graph.as_csr(ugraph)
+    offsets = graph.offsets()
+    targets = graph.targets()
+    num_nodes = graph.num_nodes()
+    labels = graph.labels()
+
+    disc = array(csr_graph.INDEX_TYPECODE, [-1]) * num_nodes
+    low = array(csr_graph.INDEX_TYPECODE, [0]) * num_nodes
+    parent = array(csr_graph.INDEX_TYPECODE, [-1]) * num_nodes
+    position = array(csr_graph.INDEX_TYPECODE, offsets[:-1])
+
+    # number of components each node is in, and the last component that counted it
+    block_counts = array(csr_graph.INDEX_TYPECODE, [0]) * num_nodes
+    last_block = array(csr_graph.INDEX_TYPECODE, [-1]) * num_nodes
+
+    bridges = []
+    sizes = []
+    edges = []
+    time = 0
+
+    for root in xrange(num_nodes):
+        if disc[root] != -1:
+            continue
+
+        disc[root] = low[root] = time
+        time += 1
+        stack = [root]
+
+        while stack:
+            node = stack[-1]
+
+            if position[node] < offsets[node + 1]:
+                # advance along the next edge of node
+                neighbour = targets[position[node]]
+                position[node] += 1
+
+                if disc[neighbour] == -1:
+                    parent[neighbour] = node
+                    disc[neighbour] = low[neighbour] = time
+                    time += 1
+                    edges.append(node)
+                    edges.append(neighbour)
+                    stack.append(neighbour)
+                elif neighbour != parent[node] and disc[neighbour] < disc[node]:
+                    # back edge to an ancestor
+                    if disc[neighbour] < low[node]:
+                        low[node] = disc[neighbour]
+                    edges.append(node)
+                    edges.append(neighbour)
+                continue
+
+            # all edges of node done, report back to its parent
+            stack.pop()
+            if not stack:
+                continue
+
+            above = stack[-1]
+            if low[node] < low[above]:
+                low[above] = low[node]
+
+            if low[node] > disc[above]:
+                bridges.append((labels[above], labels[node]))
+
+            if low[node] >= disc[above]:
+                # the edges pushed since the tree edge above -> node form one component
+                block = len(sizes)
+                size = 0
+                while True:
+                    edge_head = edges.pop()
+                    edge_tail = edges.pop()
+                    for member in (edge_tail, edge_head):
+                        if last_block[member] != block:
+                            last_block[member] = block
+                            block_counts[member] += 1
+                            size += 1
+                    if edge_tail == above and edge_head == node:
+                        break
+                sizes.append(size)
+
+    cut_nodes = [idx for idx in xrange(num_nodes) if block_counts[idx] > 1]
+    cut_nodes.sort(key=lambda idx: -block_counts[idx])
+    return [labels[idx] for idx in cut_nodes], bridges, sizes
+
+
+def articulation_points(ugraph):
+    """
+    Get the nodes whose removal disconnects their component, those splitting off the most pieces first
+
+    :rtype : list
+    :param ugraph: undirected graph
+    """
+    return biconnected_decomposition(ugraph)[0]
+
+
+def bridges(ugraph):
+    """
+    Get the edges whose removal disconnects their component
+
+    :rtype : list
+    :param ugraph: undirected graph
+    :return: list of (node, node) pairs
+    """
+    return biconnected_decomposition(ugraph)[1]
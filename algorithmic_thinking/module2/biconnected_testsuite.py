@@ -0,0 +1,130 @@
+"""
+Testing code for the articulation points, bridges and biconnected components of module 2
+
+Articulation points and bridges are checked by brute force: remove each node (edge) in turn and count the connected
+components. Run from the repository root:
+
+    python -m algorithmic_thinking.module2.biconnected_testsuite
+"""
+
+import simpletest
+import graph_fixtures
+
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module2 import biconnected as student
+
+
+def test_graphs():
+    """
+    graph_data graphs, a path, a cycle, two triangles joined at a node, and seeded sparse ER graphs
+
+    :rtype : list
+    :return: list of (name, graph) pairs
+    """
+    graphs = graph_fixtures.fixture_graphs(60, [0.03, 0.05, 0.08])
+    graphs.append(("path", {0: set([1]), 1: set([0, 2]), 2: set([1, 3]), 3: set([2])}))
+    graphs.append(("cycle", {0: set([1, 3]), 1: set([0, 2]), 2: set([1, 3]), 3: set([2, 0])}))
+    graphs.append(("bowtie", {0: set([1, 2]), 1: set([0, 2]), 2: set([0, 1, 3, 4]), 3: set([2, 4]),
+                              4: set([2, 3])}))
+    return graphs
+
+
+def num_components(ugraph, removed=()):
+    """
+    Number of connected components, not counting the removed nodes
+    """
+    return len(graph_fixtures.components(ugraph, removed))
+
+
+def brute_force_articulation_points(ugraph):
+    """
+    Nodes whose removal leaves more components than the graph had, not counting the node itself if isolated
+    """
+    base = num_components(ugraph)
+    points = set()
+    for node in ugraph:
+        if num_components(ugraph, [node]) > base - (0 if ugraph[node] else 1):
+            points.add(node)
+    return points
+
+
+def brute_force_bridges(ugraph):
+    """
+    Edges whose removal leaves more components than the graph had
+    """
+    base = num_components(ugraph)
+    bridges = set()
+    for node in ugraph:
+        for neighbour in ugraph[node]:
+            remaining = dict((other, set(ugraph[other])) for other in ugraph)
+            remaining[node].discard(neighbour)
+            remaining[neighbour].discard(node)
+            if num_components(remaining) > base:
+                bridges.add(frozenset([node, neighbour]))
+    return bridges
+
+
+def test_articulation_points_and_bridges():
+    """
+    biconnected_decomposition on dictionary and compact graphs against brute-force removal
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        expected_points = brute_force_articulation_points(ugraph)
+        expected_bridges = brute_force_bridges(ugraph)
+
+        for description, graph in [("", ugraph), (" (compact)", csr_graph.from_dict(ugraph))]:
+            points, bridges, dummy_sizes = student.biconnected_decomposition(graph)
+            message = "Testing biconnected_decomposition on " + name + description + ":"
+            suite.run_test(set(points), expected_points, message + " articulation points")
+            suite.run_test(len(points), len(expected_points), message + " no repeated articulation points")
+            suite.run_test(set(frozenset(bridge) for bridge in bridges), expected_bridges, message + " bridges")
+            suite.run_test(len(bridges), len(expected_bridges), message + " no repeated bridges")
+
+    suite.report_results()
+
+
+def test_component_sizes():
+    """
+    Component sizes: every edge lies in exactly one component, bridges are components of two nodes, and summing
+    (size - 1) over the components gives the non-isolated nodes minus the connected components that have an edge
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        points, bridges, sizes = student.biconnected_decomposition(ugraph)
+        message = "Testing component sizes on " + name + ":"
+
+        non_isolated = [node for node in ugraph if ugraph[node]]
+        with_edges = num_components(dict((node, ugraph[node]) for node in non_isolated))
+        suite.run_test(sum(size - 1 for size in sizes), len(non_isolated) - with_edges, message + " block tree")
+        suite.run_test(sizes.count(2) >= len(bridges), True, message + " bridges are two-node components")
+        suite.run_test(min(sizes or [2]) >= 2, True, message + " no component below two nodes")
+
+    suite.report_results()
+
+
+def test_deep_path():
+    """
+    A long path needs no recursion: every inner node is an articulation point and every edge a bridge
+    """
+    suite = simpletest.TestSuite()
+
+    num_nodes = 20000
+    path = dict((node, set()) for node in xrange(num_nodes))
+    for node in xrange(num_nodes - 1):
+        path[node].add(node + 1)
+        path[node + 1].add(node)
+
+    points, bridges, sizes = student.biconnected_decomposition(path)
+    suite.run_test(len(points), num_nodes - 2, "Testing a long path: articulation points")
+    suite.run_test(len(bridges), num_nodes - 1, "Testing a long path: bridges")
+    suite.run_test(sizes, [2] * (num_nodes - 1), "Testing a long path: component sizes")
+
+    suite.report_results()
+
+
+test_articulation_points_and_bridges()
+test_component_sizes()
+test_deep_path()
@@ -0,0 +1,101 @@
+"""
+k-core decomposition of undirected graphs, and core-based attack orders
+"""
+__author__ = 'mamaray'
+
+from array import array
+from algorithmic_thinking import csr_graph
+
+
+def core_decomposition(ugraph):
+    """
+    Compute the core number of every node by peeling the graph in O(n + m) (Batagelj & Zaversnik)
+
+    The same bucket-by-degree idea as assignment.fast_targeted_order, but the buckets are one int32 array of nodes
+    sorted by current degree plus the start of every degree's range in it: lowering a node's degree swaps it to the
+    front of its range and moves the range boundary, O(1) with no set operations.
+
+    :rtype : tuple
+    :param ugraph: undirected graph (dictionary or csr_graph.CSRGraph)
+    :return: (nodes, cores, order) where cores is an int32 array holding the core number of each entry of nodes, and
+             order is an int32 array of indices into nodes in the order they were peeled (by ascending core number)
+    """
+    graph = csr_graph.as_csr(ugraph)
+    offsets = graph.offsets()
+    targets = graph.targets()
+    num_nodes = graph.num_nodes()
+
+    # current degree of every node, ends up as its core number
+    degrees = graph.out_degrees()
+    max_degree = max(degrees) if num_nodes else 0
+
+    # bucket starts: counting sort of the nodes by degree
+    starts = array(csr_graph.INDEX_TYPECODE, [0]) * (max_degree + 1)
+    for degree in degrees:
+        starts[degree] += 1
+    start = 0
+    for degree in xrange(max_degree + 1):
+        count = starts[degree]
+        starts[degree] = start
+        start += count
+
+    order = array(csr_graph.INDEX_TYPECODE, [0]) * num_nodes
+    positions = array(csr_graph.INDEX_TYPECODE, [0]) * num_nodes
+    for node in xrange(num_nodes):
+        degree = degrees[node]
+        positions[node] = starts[degree]
+        order[starts[degree]] = node
+        starts[degree] += 1
+
+    # shift the starts back after filling
+    for degree in xrange(max_degree, 0, -1):
+        starts[degree] = starts[degree - 1]
+    starts[0] = 0
+
+    # peel the nodes in order of current degree
+    for idx in xrange(num_nodes):
+        node = order[idx]
+        degree = degrees[node]
+        for neighbour in targets[offsets[node]:offsets[node + 1]]:
+            neighbour_degree = degrees[neighbour]
+            if neighbour_degree > degree:
+                # swap the neighbour with the first node of its bucket, then shrink the bucket from the front
+                first_pos = starts[neighbour_degree]
+                first = order[first_pos]
+                if first != neighbour:
+                    neighbour_pos = positions[neighbour]
+                    order[neighbour_pos] = first
+                    positions[first] = neighbour_pos
+                    order[first_pos] = neighbour
+                    positions[neighbour] = first_pos
+                starts[neighbour_degree] += 1
+                degrees[neighbour] = neighbour_degree - 1
+
+    return graph.labels(), degrees, order
+
+
+def core_numbers(ugraph):
+    """
+    Get the core number of every node
+
+    :rtype : dict
+    :param ugraph: undirected graph
+    :return: dict of node -> largest k such that the node is in the k-core
+    """
+    nodes, cores, dummy_order = core_decomposition(ugraph)
+    return dict((nodes[idx], cores[idx]) for idx in xrange(len(cores)))
+
+
+def core_order(ugraph):
+    """
+    Compute an attack order that removes the innermost cores first
+
+    The reverse of the peeling order, so nodes come by descending core number. Costs O(n + m), the same as
+    assignment.fast_targeted_order.
+
+    :rtype : list
+    :param ugraph: undirected graph
+    :return: list of nodes
+    """
+    nodes, dummy_cores, order = core_decomposition(ugraph)
+    return [nodes[idx] for idx in reversed(order)]
@@ -0,0 +1,80 @@
+"""
+Testing code for the k-core decomposition of module 2
+
+Core numbers are checked against a naive peel that repeatedly strips every node of degree <= k. Run from the
+repository root:
+
+    python -m algorithmic_thinking.module2.cores_testsuite
+"""
+
+import simpletest
+import graph_fixtures
+
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module2 import cores as student
+
+
+def test_graphs():
+    """
+    graph_data graphs, the empty graph and seeded random ER graphs of varying density
+
+    :rtype : list
+    :return: list of (name, graph) pairs
+    """
+    return graph_fixtures.fixture_graphs(120, [0.01, 0.03, 0.06, 0.1]) + [("empty graph", {})]
+
+
+def naive_core_numbers(ugraph):
+    """
+    Core numbers by peeling: for k = 0, 1, ... strip nodes of degree <= k until none are left, they have core k
+    """
+    remaining = dict((node, set(ugraph[node])) for node in ugraph)
+    cores = {}
+    k = 0
+    while remaining:
+        low = [node for node in remaining if len(remaining[node]) <= k]
+        if not low:
+            k += 1
+            continue
+        for node in low:
+            cores[node] = k
+            for neighbour in remaining[node]:
+                remaining[neighbour].discard(node)
+            del remaining[node]
+    return cores
+
+
+def test_core_numbers():
+    """
+    core_numbers on dictionary and compact graphs against the naive peel
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        expected = naive_core_numbers(ugraph)
+        message = "Testing core_numbers on " + name + ":"
+        suite.run_test(student.core_numbers(ugraph), expected, message)
+        suite.run_test(student.core_numbers(csr_graph.from_dict(ugraph)), expected, message + " (compact)")
+
+    suite.report_results()
+
+
+def test_core_order():
+    """
+    core_order lists every node once, by descending core number
+    """
+    suite = simpletest.TestSuite()
+
+    for name, ugraph in test_graphs():
+        cores = naive_core_numbers(ugraph)
+        order = student.core_order(ugraph)
+        message = "Testing core_order on " + name + ":"
+        suite.run_test(sorted(order), sorted(ugraph), message + " every node once")
+        suite.run_test([cores[node] for node in order], sorted([cores[node] for node in order], reverse=True),
+                       message + " descending core numbers")
+
+    suite.report_results()
+
+
+test_core_numbers()
+test_core_order()
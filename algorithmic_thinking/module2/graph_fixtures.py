@@ -0,0 +1,69 @@
+"""
+Fixture graphs and reference searches shared by the module 2 test suites
+"""
+
+import graph_data
+
+from algorithmic_thinking.module2.parallel_er import parallel_random_ugraph
+
+# every graph of graph_data, as (name, graph) pairs
+GRAPHS = [(name, getattr(graph_data, name)) for name in sorted(dir(graph_data)) if name.startswith("GRAPH")]
+
+
+def fixture_graphs(num_nodes, probabilities):
+    """
+    graph_data graphs plus one seeded ER graph per probability
+
+    :rtype : list
+    :param num_nodes: number of nodes of the ER graphs
+    :param probabilities: edge probabilities, the i-th graph is generated with seed i
+    :return: list of (name, graph) pairs
+    """
+    graphs = list(GRAPHS)
+    for seed, probability in enumerate(probabilities):
+        graphs.append(("ER(%d, %s)" % (num_nodes, probability),
+                       parallel_random_ugraph(num_nodes, probability, seed=seed, processes=1)))
+    return graphs
+
+
+def search(ugraph, source, removed=()):
+    """
+    Breadth-first search from source, skipping the removed nodes
+
+    :rtype : tuple
+    :return: (dist, sigma) dicts over every node reached: hop distance and number of shortest paths from source
+    """
+    removed = set(removed)
+    dist = {source: 0}
+    sigma = {source: 1}
+    queue = [source]
+    for node in queue:
+        for neighbour in ugraph[node]:
+            if neighbour in removed:
+                continue
+            if neighbour not in dist:
+                dist[neighbour] = dist[node] + 1
+                sigma[neighbour] = 0
+                queue.append(neighbour)
+            if dist[neighbour] == dist[node] + 1:
+                sigma[neighbour] += sigma[node]
+    return dist, sigma
+
+
+def components(ugraph, removed=()):
+    """
+    Connected components of the graph without the removed nodes, by a search from every node not reached yet
+
+    :rtype : list
+    :return: list of sets of nodes
+    """
+    removed = set(removed)
+    seen = set()
+    found = []
+    for start in ugraph:
+        if start in removed or start in seen:
+            continue
+        component = set(search(ugraph, start, removed)[0])
+        seen.update(component)
+        found.append(component)
+    return found
@@ -0,0 +1,132 @@
+"""
+Monte Carlo resilience: average compute_resilience over many random attack orders in parallel
+"""
+__author__ = 'mamaray'
+
+import random
+import multiprocessing
+from array import array
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module1.replicas import replica_seeds
+from algorithmic_thinking.module2 import project
+
+# graph shared with the worker processes, set by _share_graph
+_shared_graph = None
+
+
+def _share_graph(graph):
+    """
+    Pool initializer: keep the graph in the worker
+
+    With the fork start method the graph is inherited from the parent, not pickled, and as long as nobody writes to
+    it the memory stays shared copy-on-write.
+
+    :param graph: graph to attack
+    """
+    global _shared_graph
+    _shared_graph = graph
+
+
+def _merge(stats, other):
+    """
+    Combine two (count, mean, M2) per-step accumulators (Chan et al.'s parallel variance update)
+
+    :rtype : tuple
+    :param stats: accumulator or None
+    :param other: accumulator
+    """
+    if stats is None:
+        return other
+
+    count_a, mean_a, m2_a = stats
+    count_b, mean_b, m2_b = other
+    count = count_a + count_b
+
+    mean = array('d', mean_a)
+    m2 = array('d', m2_a)
+    for step in xrange(len(mean)):
+        delta = mean_b[step] - mean_a[step]
+        mean[step] += delta * count_b / count
+        m2[step] += m2_b[step] + delta * delta * count_a * count_b / count
+
+    return count, mean, m2
+
+
+def _run_batch(seeds):
+    """
+    Worker: run one random attack per seed and fold the curves into a per-step accumulator
+
+    :rtype : tuple
+    :param seeds: list of seeds
+    :return: (count, mean, M2) accumulator
+    """
+    graph = _shared_graph
+    nodes = list(graph.keys())
+
+    stats = None
+    for seed in seeds:
+        # the same attack as assignment.random_order, drawn from the seed
+        order = list(nodes)
+        random.Random(seed).shuffle(order)
+        curve = project.compute_resilience(graph, order)
+
+        stats = _merge(stats, (1, array('d', curve), array('d', [0.0]) * len(curve)))
+
+    return stats
+
+
+def monte_carlo_resilience(ugraph, num_attacks, seed=0, processes=None, batch_size=None):
+    """
+    Average the resilience curve of a graph over num_attacks random attack orders
+
+    The graph is converted to a csr_graph.CSRGraph once and shared read-only with the pool. Every attack gets its
+    own seed (see replicas.replica_seeds), so results do not depend on the number of processes. Workers send back
+    per-step mean/variance accumulators for their batch of attacks, never whole curves, and the batches are merged as
+    they come in.
+
+    :rtype : tuple
+    :param ugraph: undirected graph
+    :param num_attacks: number of random attack orders
+    :param seed: base seed
+    :param processes: pool size, defaults to the number of CPUs; 1 runs everything in this process
+    :param batch_size: attacks per task, defaults to spreading them evenly over the pool
+    :return: (mean, variance) lists, entry k is the largest component size after k removals
+    """
+    graph = csr_graph.as_csr(ugraph)
+    seeds = replica_seeds(seed, num_attacks)
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if batch_size is None:
+        batch_size = max(1, num_attacks // (4 * processes))
+    batches = [seeds[start:start + batch_size] for start in xrange(0, num_attacks, batch_size)]
+
+    stats = None
+    if processes == 1:
+        _share_graph(graph)
+        try:
+            for batch in batches:
+                stats = _merge(stats, _run_batch(batch))
+        finally:
+            _share_graph(None)
+    else:
+        pool = multiprocessing.Pool(processes, initializer=_share_graph, initargs=(graph,))
+        try:
+            for batch_stats in pool.imap(_run_batch, batches):
+                stats = _merge(stats, batch_stats)
+        finally:
+            pool.close()
+            pool.join()
+
+    if stats is None:
+        return [], []
+
+    count, mean, m2 = stats
+
+    # sample variance of each step
+    if count > 1:
+        variance = [value / (count - 1) for value in m2]
+    else:
+        variance = [0.0] * len(m2)
+
+    return list(mean), variance
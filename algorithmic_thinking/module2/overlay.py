@@ -0,0 +1,171 @@
+"""
+Copy-free node removal on top of an immutable graph
+"""
+__author__ = 'mamaray'
+
+from array import array
+from algorithmic_thinking import csr_graph
+
+
+class RemovalOverlay:
+    """
+    View of a graph with some nodes removed, without copying or changing the graph
+
+    Removed nodes are tracked in a bytearray and the live degree of every node in an int32 array, both indexed by the
+    dense ids of the underlying csr_graph.CSRGraph; neighbour lists are filtered on the fly. Building an overlay costs
+    O(n), so any number of attack simulations can run side by side against one shared base graph.
+
+    For reading, an overlay behaves like the (remaining) dictionary graph: overlay[node], keys(), len, iteration and
+    membership use node labels. An overlay of an overlay starts from the other's removals and shares its base graph,
+    so an attack can continue from a partly removed graph without touching it.
+    """
+
+    def __init__(self, ugraph):
+        """
+        Create an overlay with no nodes removed
+
+        :param ugraph: undirected graph (dictionary, CSRGraph or RemovalOverlay); dictionary graphs are converted,
+                       which copies the whole graph, so pass the CSRGraph when several overlays share a graph
+        """
+        if isinstance(ugraph, RemovalOverlay):
+            self._graph = ugraph.graph()
+            self._removed = bytearray(ugraph.removed())
+            self._degrees = array(csr_graph.INDEX_TYPECODE, ugraph.degrees())
+            self._num_live = len(ugraph)
+            return
+
+        self._graph = csr_graph.as_csr(ugraph)
+        self._removed = bytearray(self._graph.num_nodes())
+        self._degrees = self._graph.out_degrees()
+        self._num_live = self._graph.num_nodes()
+
+    def __len__(self):
+        """
+        Number of remaining nodes
+        """
+        return self._num_live
+
+    def __contains__(self, node):
+        """
+        Check if a node is in the graph and not removed
+        """
+        return node in self._graph and not self._removed[self._graph.node_index(node)]
+
+    def __iter__(self):
+        """
+        Iterate over the remaining node labels
+        """
+        removed = self._removed
+        for idx, node in enumerate(self._graph.labels()):
+            if not removed[idx]:
+                yield node
+
+    def __getitem__(self, node):
+        """
+        Get the remaining neighbours of a remaining node
+
+        :rtype : list
+        :param node: node label
+        """
+        idx = self._live_index(node)
+        labels = self._graph.labels()
+        return [labels[neighbour] for neighbour in self.live_neighbours(idx)]
+
+    def _live_index(self, node):
+        """
+        Dense id of a remaining node, KeyError for removed or unknown nodes
+        """
+        idx = self._graph.node_index(node)
+        if self._removed[idx]:
+            raise KeyError(node)
+        return idx
+
+    def keys(self):
+        """
+        List of remaining node labels
+
+        :rtype : list
+        """
+        return list(self)
+
+    def graph(self):
+        """
+        Get the underlying CSRGraph
+
+        :rtype : csr_graph.CSRGraph
+        """
+        return self._graph
+
+    def removed(self):
+        """
+        Get the bytearray of removal flags by dense id (read only, use delete_index to remove nodes)
+
+        :rtype : bytearray
+        """
+        return self._removed
+
+    def degrees(self):
+        """
+        Get the int32 array of live degrees by dense id (read only, removed nodes have degree 0)
+
+        :rtype : array
+        """
+        return self._degrees
+
+    def degree(self, node):
+        """
+        Number of remaining neighbours of a remaining node
+
+        :rtype : int
+        :param node: node label
+        """
+        return self._degrees[self._live_index(node)]
+
+    def delete_node(self, node):
+        """
+        Remove a node (and so all its edges)
+
+        :param node: node label
+        """
+        self.delete_index(self._live_index(node))
+
+    def is_removed(self, idx):
+        """
+        Check if the node with the given dense id is removed
+
+        :rtype : bool
+        """
+        return self._removed[idx] == 1
+
+    def degree_of(self, idx):
+        """
+        Live degree of the node with the given dense id
+
+        :rtype : int
+        """
+        return self._degrees[idx]
+
+    def live_neighbours(self, idx):
+        """
+        Iterate over the dense ids of the remaining neighbours of a dense id
+
+        :param idx: dense node id
+        """
+        removed = self._removed
+        for neighbour in self._graph.neighbours(idx):
+            if not removed[neighbour]:
+                yield neighbour
+
+    def delete_index(self, idx):
+        """
+        Remove the node with the given dense id, lowering the live degree of its remaining neighbours
+
+        :param idx: dense node id
+        """
+        degrees = self._degrees
+        for neighbour in self.live_neighbours(idx):
+            degrees[neighbour] -= 1
+
+        self._removed[idx] = 1
+        degrees[idx] = 0
+        self._num_live -= 1
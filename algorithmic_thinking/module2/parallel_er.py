@@ -0,0 +1,119 @@
+"""
+Block-parallel generation of ER undirected graphs
+"""
+__author__ = 'mamaray'
+
+import math
+import random
+import multiprocessing
+from array import array
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module1.replicas import replica_seeds
+
+# target number of node pairs (upper triangle entries) per block
+BLOCK_PAIRS = 1 << 22
+
+
+def row_blocks(num_nodes, block_pairs=BLOCK_PAIRS):
+    """
+    Split the rows of the upper triangle of the adjacency matrix into blocks of about block_pairs pairs each
+
+    Row x holds the pairs (x, y) with y > x, so early rows are long and late rows short; cutting by pairs instead of
+    rows gives every block about the same amount of work. The blocks only depend on the arguments, never on the
+    number of workers.
+
+    :rtype : list
+    :param num_nodes: number of nodes
+    :param block_pairs: target number of pairs per block
+    :return: list of (first row, end row) tuples
+    """
+    blocks = []
+    start = 0
+    pairs = 0
+    for node_x in xrange(num_nodes):
+        pairs += num_nodes - 1 - node_x
+        if pairs >= block_pairs:
+            blocks.append((start, node_x + 1))
+            start = node_x + 1
+            pairs = 0
+
+    if start < num_nodes:
+        blocks.append((start, num_nodes))
+    return blocks
+
+
+def _er_block(task):
+    """
+    Worker: draw the edges of one row block
+
+    Pairs are visited row by row and the gap to the next edge is drawn geometrically (Batagelj & Brandes), so the
+    cost is one random number per edge rather than per pair.
+
+    :rtype : array
+    :param task: (first row, end row, number of nodes, probability, seed) tuple
+    :return: int32 array of flattened (node_x, node_y) pairs with node_x < node_y
+    """
+    start, end, num_nodes, probability, seed = task
+    edges = array(csr_graph.INDEX_TYPECODE)
+    if probability <= 0 or start >= end:
+        return edges
+
+    rng = random.Random(seed)
+    log_q = math.log(1.0 - probability) if probability < 1 else None
+
+    node_x = start
+    node_y = start
+    while True:
+        # number of non-edges before the next edge
+        if log_q is None:
+            node_y += 1
+        else:
+            node_y += 1 + int(math.log(1.0 - rng.random()) / log_q)
+
+        # carry the overflow over into the following rows
+        while node_y >= num_nodes:
+            node_x += 1
+            if node_x >= end:
+                return edges
+            node_y = node_x + 1 + node_y - num_nodes
+
+        edges.append(node_x)
+        edges.append(node_y)
+
+
+def parallel_random_ugraph(num_nodes, probability, seed=0, processes=None, block_pairs=BLOCK_PAIRS, compact=False):
+    """
+    Generate an ER undirected graph with the row blocks of the adjacency matrix drawn in parallel
+
+    Every block gets its own random stream, seeded from seed and the block's position (see replicas.replica_seeds),
+    and the blocks are merged in order, so the graph for a given seed is the same whatever the number of processes.
+
+    :rtype : dict
+    :param num_nodes: number of nodes
+    :param probability: probability of each edge existing
+    :param seed: base seed
+    :param processes: pool size, defaults to the number of CPUs; 1 runs everything in this process
+    :param block_pairs: target number of pairs per block, see row_blocks
+    :param compact: return a csr_graph.CSRGraph instead of a dictionary graph
+    :return: dictionary object representing a graph
+    """
+    blocks = row_blocks(num_nodes, block_pairs)
+    seeds = replica_seeds(seed, len(blocks))
+    tasks = [(start, end, num_nodes, probability, block_seed) for (start, end), block_seed in zip(blocks, seeds)]
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    if processes == 1:
+        graph = csr_graph.from_edges(num_nodes, (_er_block(task) for task in tasks))
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            graph = csr_graph.from_edges(num_nodes, pool.imap(_er_block, tasks))
+        finally:
+            pool.close()
+            pool.join()
+
+    if compact:
+        return graph
+    return graph.to_dict()
@@ -0,0 +1,115 @@
+"""
+Testing code for the block-parallel ER generator of module 2
+
+The graph for a seed must not depend on the number of processes or on how its blocks are spread over them, and
+every pair must be an edge with the given probability, including the pairs where _er_block carries a skip over a
+row or block boundary. Run from the repository root:
+
+    python -m algorithmic_thinking.module2.parallel_er_testsuite
+"""
+
+import math
+
+import simpletest
+
+from algorithmic_thinking.module2 import parallel_er as student
+
+# (number of nodes, block_pairs) settings with blocks of one row, of a few rows, and a single block
+BLOCK_SETTINGS = [(12, 7), (12, 20), (12, 1000), (40, 37), (40, 150)]
+
+
+def test_row_blocks():
+    """
+    Blocks are consecutive, non-empty and cover every row
+    """
+    suite = simpletest.TestSuite()
+
+    for num_nodes in [0, 1, 2, 5, 12, 40, 301]:
+        for block_pairs in [1, 7, 20, 150, 10 ** 6]:
+            blocks = student.row_blocks(num_nodes, block_pairs)
+            rows = [row for start, end in blocks for row in xrange(start, end)]
+            suite.run_test(rows, range(num_nodes), "row_blocks(%d, %d) covers every row once" % (
+                num_nodes, block_pairs))
+            suite.run_test(all(start < end for start, end in blocks), True, "row_blocks(%d, %d) non-empty" % (
+                num_nodes, block_pairs))
+
+    suite.report_results()
+
+
+def test_processes():
+    """
+    The same seed gives the same graph with one process and with a pool, compact or not
+    """
+    suite = simpletest.TestSuite()
+
+    for num_nodes, block_pairs in BLOCK_SETTINGS:
+        for probability in [0.0, 0.05, 0.3, 0.9, 1.0]:
+            for seed in [0, 1]:
+                label = "ER(%d, %s) seed=%d block_pairs=%d" % (num_nodes, probability, seed, block_pairs)
+                expected = student.parallel_random_ugraph(num_nodes, probability, seed=seed, processes=1,
+                                                          block_pairs=block_pairs)
+                for processes in [2, 3]:
+                    computed = student.parallel_random_ugraph(num_nodes, probability, seed=seed,
+                                                              processes=processes, block_pairs=block_pairs)
+                    suite.run_test(computed, expected, label + " processes=%d" % processes)
+
+                compact = student.parallel_random_ugraph(num_nodes, probability, seed=seed, processes=2,
+                                                         block_pairs=block_pairs, compact=True)
+                suite.run_test(compact.to_dict(), expected, label + " compact")
+
+                # undirected, no self-loops, every node present
+                suite.run_test(sorted(expected), range(num_nodes), label + " nodes")
+                suite.run_test(all(node not in expected[node] and all(node in expected[neighbour]
+                                                                      for neighbour in expected[node])
+                                   for node in expected), True, label + " symmetric without self-loops")
+
+        complete = student.parallel_random_ugraph(num_nodes, 1.0, processes=1, block_pairs=block_pairs)
+        suite.run_test(sum(len(neighbours) for neighbours in complete.itervalues()), num_nodes * (num_nodes - 1),
+                       "ER(%d, 1.0) block_pairs=%d is complete" % (num_nodes, block_pairs))
+
+    suite.report_results()
+
+
+def test_pair_frequencies():
+    """
+    Every pair, those next to row and block boundaries included, is an edge about probability of the time
+    """
+    suite = simpletest.TestSuite()
+    trials = 3000
+
+    for num_nodes, block_pairs in BLOCK_SETTINGS[:3]:
+        starts = set(start for start, dummy_end in student.row_blocks(num_nodes, block_pairs))
+        for probability in [0.05, 0.3]:
+            counts = {}
+            for seed in xrange(trials):
+                graph = student.parallel_random_ugraph(num_nodes, probability, seed=seed, processes=1,
+                                                       block_pairs=block_pairs)
+                for node_x in graph:
+                    for node_y in graph[node_x]:
+                        if node_x < node_y:
+                            counts[(node_x, node_y)] = counts.get((node_x, node_y), 0) + 1
+
+            # five standard deviations of the binomial count
+            mean = trials * probability
+            bound = 5 * math.sqrt(trials * probability * (1 - probability))
+            for node_x in xrange(num_nodes):
+                for node_y in xrange(node_x + 1, num_nodes):
+                    if node_x in starts and node_y == node_x + 1:
+                        where = "first pair of a block"
+                    elif node_x + 1 in starts and node_y == num_nodes - 1:
+                        where = "last pair of a block"
+                    elif node_y in (node_x + 1, num_nodes - 1):
+                        where = "row boundary"
+                    else:
+                        where = "inside a row"
+                    count = counts.get((node_x, node_y), 0)
+                    suite.run_test(abs(count - mean) <= bound, True,
+                                   "ER(%d, %s) block_pairs=%d pair (%d, %d), %s: %d of %d" % (
+                                       num_nodes, probability, block_pairs, node_x, node_y, where, count, trials))
+
+    suite.report_results()
+
+
+test_row_blocks()
+test_processes()
+test_pair_frequencies()
@@ -3,8 +3,16 @@ module 2 project for algorithmic thinking
 """
 __author__ = 'mamaray'
 
+from array import array
 from collections import deque
-from algorithmic_thinking.module2.provided import copy_graph
+from itertools import izip
+from algorithmic_thinking import csr_graph
+
+# numpy is optional, it only speeds up the level expansion of bfs_distances
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 def bfs_visited(ugraph, start_node):
@@ -16,6 +24,10 @@ def bfs_visited(ugraph, start_node):
     :param start_node: starting node
     :return: the set consisting of all nodes that are visited by a breadth-first search that starts at start_node
     """
+    # compact graphs are searched on dense ids
+    if isinstance(ugraph, csr_graph.CSRGraph):
+        return _csr_bfs_visited(ugraph, start_node)
+
     # stores all visited nodes
     visited = set()
     visited.add(start_node)
@@ -25,8 +37,8 @@ def bfs_visited(ugraph, start_node):
     queue.append(start_node)
 
     while queue:
-        # pop the next item from the queue
-        next_item = queue.pop()
+        # take the oldest item from the queue, so nodes are searched in breadth-first order
+        next_item = queue.popleft()
 
         # iterate through each neighbour of the dequeued node
         for neighbour in ugraph[next_item]:
@@ -38,6 +50,203 @@ def bfs_visited(ugraph, start_node):
     return visited
 
 
+def _csr_bfs_visited(ugraph, start_node):
+    """
+    bfs_visited for a csr_graph.CSRGraph, tracking visited dense ids in a bytearray
+
+    :rtype : set
+    :param ugraph: undirected CSRGraph
+    :param start_node: starting node label
+    """
+    offsets = ugraph.offsets()
+    targets = ugraph.targets()
+
+    start = ugraph.node_index(start_node)
+    visited = bytearray(ugraph.num_nodes())
+    visited[start] = 1
+    found = [start]
+
+    queue = deque()
+    queue.append(start)
+
+    while queue:
+        next_item = queue.popleft()
+
+        for neighbour in targets[offsets[next_item]:offsets[next_item + 1]]:
+            if not visited[neighbour]:
+                visited[neighbour] = 1
+                found.append(neighbour)
+                queue.append(neighbour)
+
+    labels = ugraph.labels()
+    return set(labels[idx] for idx in found)
+
+
+def bfs_distances(ugraph, start_node):
+    """
+    a function to get the hop distance from a given node to every node, searching one whole level at a time
+
+    The graph is searched on the dense ids of a csr_graph.CSRGraph with a bytearray of visited flags. Every round
+    expands the complete frontier into the next level; with numpy installed that is a handful of vectorized
+    gathers over the edge array per level instead of a Python loop per edge. For a CSRGraph labelled 0..n-1 (e.g.
+    from read_graph_data(..., compact=True) on a file with dense integer ids) nodes[i] == i, so the distance
+    array can be indexed by node directly.
+
+    :rtype : tuple
+    :param ugraph: undirected graph (dictionary or csr_graph.CSRGraph)
+    :param start_node: starting node
+    :return: (nodes, distances) where distances is an int32 array holding the hop distance of each entry of nodes
+             from start_node, -1 for nodes that cannot be reached
+    """
+    graph = csr_graph.as_csr(ugraph)
+    start = graph.node_index(start_node)
+
+    if numpy is not None and graph.num_edges():
+        return graph.labels(), _numpy_bfs_distances(graph, start)
+
+    offsets = graph.offsets()
+    targets = graph.targets()
+
+    visited = bytearray(graph.num_nodes())
+    visited[start] = 1
+    distances = array(csr_graph.INDEX_TYPECODE, [-1]) * graph.num_nodes()
+    distances[start] = 0
+
+    frontier = [start]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    distances[neighbour] = level
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+
+    return graph.labels(), distances
+
+
+def _numpy_bfs_distances(graph, start):
+    """
+    bfs_distances with every level expanded by numpy
+
+    :rtype : array
+    :param graph: undirected CSRGraph with at least one edge
+    :param start: dense id of the starting node
+    """
+    offsets = numpy.frombuffer(graph.offsets(), dtype=numpy.int32)
+    targets = numpy.frombuffer(graph.targets(), dtype=numpy.int32)
+
+    visited = numpy.zeros(graph.num_nodes(), dtype=numpy.bool_)
+    visited[start] = True
+    distances = numpy.full(graph.num_nodes(), -1, dtype=numpy.int32)
+    distances[start] = 0
+
+    frontier = numpy.array([start], dtype=numpy.int32)
+    level = 0
+    while frontier.size:
+        level += 1
+
+        # slot of every frontier edge in the target array: each row's start, plus the position within the row
+        starts = offsets[frontier]
+        lengths = offsets[frontier + 1] - starts
+        total = lengths.sum()
+        if not total:
+            break
+        slots = numpy.arange(total) + numpy.repeat(starts - (numpy.cumsum(lengths) - lengths), lengths)
+
+        # the unvisited neighbours, once each, are the next level
+        neighbours = targets[slots]
+        frontier = numpy.unique(neighbours[~visited[neighbours]])
+        visited[frontier] = True
+        distances[frontier] = level
+
+    result = array(csr_graph.INDEX_TYPECODE)
+    result.fromstring(distances.tostring())
+    return result
+
+
+def cc_labels(ugraph):
+    """
+    a function to label every node with the number of its connected component, in one linear pass
+
+    Dictionary graphs are searched as they are, compact graphs on their dense ids; neither is converted.
+
+    :rtype : tuple
+    :param ugraph: undirected graph (dictionary or csr_graph.CSRGraph)
+    :return: (nodes, labels, sizes) where labels is an int32 array holding the component number of each entry of
+             nodes, and sizes[c] is the number of nodes in component c
+    """
+    if isinstance(ugraph, csr_graph.CSRGraph):
+        return _csr_cc_labels(ugraph)
+
+    nodes = ugraph.keys()
+    component = {}
+    sizes = []
+
+    queue = deque()
+    for start in nodes:
+        if start in component:
+            continue
+
+        # search the new component, labelling nodes as they are queued
+        label = len(sizes)
+        component[start] = label
+        size = 1
+        queue.append(start)
+
+        while queue:
+            next_item = queue.pop()
+            for neighbour in ugraph[next_item]:
+                if neighbour not in component:
+                    component[neighbour] = label
+                    size += 1
+                    queue.append(neighbour)
+
+        sizes.append(size)
+
+    return nodes, array(csr_graph.INDEX_TYPECODE, [component[node] for node in nodes]), sizes
+
+
+def _csr_cc_labels(ugraph):
+    """
+    cc_labels for a csr_graph.CSRGraph, labelling dense ids in an int32 array
+
+    :rtype : tuple
+    :param ugraph: undirected CSRGraph
+    """
+    offsets = ugraph.offsets()
+    targets = ugraph.targets()
+
+    labels = array(csr_graph.INDEX_TYPECODE, [-1]) * ugraph.num_nodes()
+    sizes = []
+
+    queue = deque()
+    for start in xrange(ugraph.num_nodes()):
+        if labels[start] != -1:
+            continue
+
+        # search the new component, labelling nodes as they are queued
+        label = len(sizes)
+        labels[start] = label
+        size = 1
+        queue.append(start)
+
+        while queue:
+            next_item = queue.pop()
+            for neighbour in targets[offsets[next_item]:offsets[next_item + 1]]:
+                if labels[neighbour] == -1:
+                    labels[neighbour] = label
+                    size += 1
+                    queue.append(neighbour)
+
+        sizes.append(size)
+
+    return ugraph.labels(), labels, sizes
+
+
 def cc_visited(ugraph):
     """
     a function to get the set of connected components of a given graph
@@ -46,21 +255,14 @@ def cc_visited(ugraph):
     :param ugraph: undirected graph
     :return: list of connected components of ugraph
     """
-    # start an empty list of connected component
-    ccs = []
-
-    # initialize local variable
-    remaining_nodes = set(ugraph.keys())
+    nodes, labels, sizes = cc_labels(ugraph)
 
-    while remaining_nodes:
-        # get all connected nodes of a random node
-        visited = bfs_visited(ugraph, remaining_nodes.pop())
+    # start an empty set for each connected component
+    ccs = [set() for dummy_idx in xrange(len(sizes))]
 
-        # add to the connected component list
-        ccs.append(visited)
-
-        # remove from remaining nodes to check
-        remaining_nodes = remaining_nodes.difference(visited)
+    # put every node into its component's set
+    for node, label in izip(nodes, labels):
+        ccs[label].add(node)
 
     return ccs
 
@@ -73,48 +275,137 @@ def largest_cc_size(ugraph):
     :param ugraph: undirected graph
     :return: size (integer) of the largest connected component in ugraph
     """
-    max_size = 0
-
-    # get all connected components
-    ccs = cc_visited(ugraph)
+    # read the sizes off the component labelling
+    sizes = cc_labels(ugraph)[2]
+    if not sizes:
+        return 0
 
-    # find largest connected component
-    for component in ccs:
-        dummy_len = len(component)
-        if dummy_len > max_size:
-            max_size = dummy_len
+    return max(sizes)
 
-    return max_size
 
-
-def compute_resilience(ugraph, attack_order):
+def _find(parent, idx):
     """
-    a function to test the resiliency of a graph by removing nodes/edges
+    Find the root of a node in a disjoint-set forest, halving the path on the way
 
-    :rtype : list
-    :param ugraph:
-    :param attack_order:
-    :return:
+    :rtype : int
+    :param parent: list of parent ids
+    :param idx: node id
     """
-    # copy the graph
-    graph = copy_graph(ugraph)
+    while parent[idx] != idx:
+        parent[idx] = parent[parent[idx]]
+        idx = parent[idx]
+    return idx
 
-    # get all connected components of ugraph and add to list
-    lcc = [largest_cc_size(graph)]
 
-    # loop through each attack
-    for attack in attack_order:
-        # remove the node
-        edges = graph.pop(attack)
+def _reverse_resilience(ugraph, attack_order):
+    """
+    Replay an attack backwards, adding the attacked nodes back into a disjoint-set forest (union by size)
+
+    :param ugraph: undirected graph
+    :param attack_order: list of distinct nodes to remove, in order
+    :return: generator of (number of removed nodes, largest component size), from len(attack_order) down to 0
+    """
+    # dense ids for the disjoint-set forest
+    nodes = ugraph.keys()
+    index = dict((node, idx) for idx, node in enumerate(nodes))
+    parent = range(len(nodes))
+    size = [1] * len(nodes)
+    present = [False] * len(nodes)
+
+    # nodes that are never attacked go in first, then the attacks in reverse
+    attacked = set(attack_order)
+    replay = [node for node in nodes if node not in attacked]
+    num_survivors = len(replay)
+    replay.extend(reversed(attack_order))
+
+    # no survivors: the state after the last attack is the empty graph
+    removed = len(attack_order)
+    if num_survivors == 0:
+        yield removed, 0
+
+    largest = 0
+    for step, node in enumerate(replay):
+        idx = index[node]
+        present[idx] = True
+        root = idx
+
+        # merge the node with the components of its present neighbours
+        for neighbour in ugraph[node]:
+            other = index[neighbour]
+            if not present[other]:
+                continue
+
+            other = _find(parent, other)
+            if other == root:
+                continue
+            if size[root] < size[other]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size[other]
+
+        if size[root] > largest:
+            largest = size[root]
+
+        # report the state once all survivors are in, and after every attacked node
+        if step >= num_survivors:
+            removed -= 1
+        if step + 1 >= num_survivors:
+            yield removed, largest
+
+
+def compute_resilience(ugraph, attack_order, checkpoints=None, stop_below=None):
+    """
+    a function to test the resiliency of a graph by removing nodes/edges
 
-        # remove edges from other nodes
-        for node in edges:
-            graph[node].discard(attack)
+    The attack order is replayed backwards: starting from the nodes that survive every attack, the attacked nodes are
+    added back one at a time into a disjoint-set forest (union by size) while the size of the largest component is
+    tracked. This gives the same list as recomputing the largest connected component after every removal, in
+    O((n + m) * alpha(n)) instead of O(n * (n + m)).
 
-        # calculate largest connected component
-        lcc.append(largest_cc_size(graph))
+    With checkpoints and/or stop_below only those answers are computed, and the replay stops as soon as they are
+    known, skipping the start of the attack: checkpoints asks for the sizes after the given numbers of removals,
+    stop_below for the first number of removals that leaves the largest component smaller than stop_below.
 
-    return lcc
+    :rtype : list, or tuple with checkpoints or stop_below
+    :param ugraph: undirected graph
+    :param attack_order: list of distinct nodes to remove, in order
+    :param checkpoints: numbers of removed nodes (0..len(attack_order)) to report
+    :param stop_below: report the first point where the largest component is smaller than this
+    :return: without checkpoints and stop_below, the list of the sizes of the largest connected component before
+             the attack and after each removal. Otherwise a (sizes, crossing) tuple: sizes is a dict of checkpoint ->
+             largest component size (empty without checkpoints), crossing is the (number of removed nodes, largest
+             component size) pair at the first point below stop_below, or None without stop_below or if the attack
+             never gets there
+    """
+    replay = _reverse_resilience(ugraph, attack_order)
+
+    if checkpoints is None and stop_below is None:
+        lcc = [largest for dummy_removed, largest in replay]
+        lcc.reverse()
+        return lcc
+
+    wanted = set(checkpoints or [])
+    for checkpoint in wanted:
+        if not 0 <= checkpoint <= len(attack_order):
+            raise ValueError("checkpoint out of range: " + str(checkpoint))
+
+    answers = {}
+    below = None
+    for removed, largest in replay:
+        if removed in wanted:
+            answers[removed] = largest
+            wanted.remove(removed)
+
+        # going backwards the largest component only grows, so the last state below the threshold is the first one
+        # the forward attack reaches
+        threshold_known = stop_below is None or largest >= stop_below
+        if not threshold_known:
+            below = (removed, largest)
+
+        if not wanted and threshold_known:
+            break
+
+    return answers, below
 
 
 # import cProfile, pstats, StringIO
@@ -0,0 +1,128 @@
+"""
+Testing code for the connected-component and resilience functions of module 2
+
+compute_resilience (with its checkpoint and threshold modes), cc_visited and largest_cc_size are checked against a
+plain breadth-first search recomputed from scratch after every removal, on every graph in graph_data. Run from the
+repository root:
+
+    python -m algorithmic_thinking.module2.project_testsuite
+"""
+
+import random
+
+import simpletest
+import graph_fixtures
+
+from algorithmic_thinking import csr_graph
+from algorithmic_thinking.module2 import project as student
+
+GRAPHS = graph_fixtures.GRAPHS
+
+
+def reference_resilience(ugraph, attack_order):
+    """
+    Largest component size before the attack and after each removal, recomputed from scratch every step
+    """
+    sizes = []
+    for removed in xrange(len(attack_order) + 1):
+        components = graph_fixtures.components(ugraph, attack_order[:removed])
+        sizes.append(max([len(component) for component in components] or [0]))
+    return sizes
+
+
+def attack_orders(ugraph, rng):
+    """
+    Attack orders to try on a graph: empty, every node (in two orders), a shuffle and two partial shuffles
+
+    :rtype : list
+    :return: list of (description, order) pairs
+    """
+    nodes = list(ugraph)
+    shuffled = list(nodes)
+    rng.shuffle(shuffled)
+
+    return [("empty order", []),
+            ("every node", nodes),
+            ("every node, reversed", list(reversed(nodes))),
+            ("every node, shuffled", shuffled),
+            ("one node", shuffled[:1]),
+            ("half the nodes", shuffled[:len(shuffled) // 2])]
+
+
+def test_compute_resilience():
+    """
+    compute_resilience on dictionary and compact graphs against the per-step search
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(2)
+
+    for name, ugraph in GRAPHS:
+        compact = csr_graph.from_dict(ugraph)
+        for description, order in attack_orders(ugraph, rng):
+            expected = reference_resilience(ugraph, order)
+            message = "Testing compute_resilience on " + name + ", " + description + ":"
+            suite.run_test(student.compute_resilience(ugraph, order), expected, message)
+            suite.run_test(student.compute_resilience(compact, order), expected, message + " (compact)")
+
+    suite.report_results()
+
+
+def test_checkpoints_and_threshold():
+    """
+    compute_resilience with checkpoints and stop_below against the full per-step list
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(4)
+
+    for name, ugraph in GRAPHS:
+        for description, order in attack_orders(ugraph, rng):
+            expected = reference_resilience(ugraph, order)
+            message = "Testing compute_resilience on " + name + ", " + description + ":"
+
+            checkpoints = sorted(set([0, len(order), len(order) // 2, rng.randrange(len(order) + 1)]))
+            expected_sizes = dict((removed, expected[removed]) for removed in checkpoints)
+            suite.run_test(student.compute_resilience(ugraph, order, checkpoints=checkpoints), (expected_sizes, None),
+                           message + " checkpoints " + str(checkpoints))
+
+            for stop_below in [1, expected[0], expected[0] // 2 + 1, expected[0] + 1]:
+                crossing = None
+                for removed, size in enumerate(expected):
+                    if size < stop_below:
+                        crossing = (removed, size)
+                        break
+                suite.run_test(student.compute_resilience(ugraph, order, stop_below=stop_below), ({}, crossing),
+                               message + " stop_below " + str(stop_below))
+                suite.run_test(student.compute_resilience(ugraph, order, checkpoints=checkpoints,
+                                                          stop_below=stop_below), (expected_sizes, crossing),
+                               message + " checkpoints and stop_below " + str(stop_below))
+
+    suite.report_results()
+
+
+def test_components():
+    """
+    cc_visited and largest_cc_size against the search, on the whole graph and with some nodes taken out
+    """
+    suite = simpletest.TestSuite()
+    rng = random.Random(3)
+
+    for name, ugraph in GRAPHS:
+        for description, order in attack_orders(ugraph, rng):
+            removed = set(order)
+            remaining = dict((node, set(neighbour for neighbour in ugraph[node] if neighbour not in removed))
+                             for node in ugraph if node not in removed)
+            expected = graph_fixtures.components(remaining)
+            message = "Testing on " + name + " without " + description + ":"
+
+            computed = student.cc_visited(remaining)
+            suite.run_test(sorted(sorted(component) for component in computed),
+                           sorted(sorted(component) for component in expected), message + " cc_visited")
+            suite.run_test(student.largest_cc_size(remaining), max([len(cc) for cc in expected] or [0]),
+                           message + " largest_cc_size")
+
+    suite.report_results()
+
+
+test_compute_resilience()
+test_checkpoints_and_threshold()
+test_components()
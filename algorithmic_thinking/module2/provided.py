@@ -1,6 +1,9 @@
 # ###########################################
 # Provided code
 
+from algorithmic_thinking.module2.overlay import RemovalOverlay
+
+
 def copy_graph(graph):
     """
     Make a copy of a graph
@@ -24,26 +27,32 @@ def delete_node(ugraph, node):
 def targeted_order(ugraph):
     """
     Compute a targeted attack order consisting of nodes of maximal degree
+
+    Removals are tracked in an overlay.RemovalOverlay instead of a copy of the graph
     
     :rtype : list
-    :param ugraph: input graph
+    :param ugraph: input graph (dictionary, csr_graph.CSRGraph or overlay.RemovalOverlay); a dictionary is converted
+                   to a CSRGraph first, so callers attacking one graph several times should pass its CSRGraph
     Returns: A list of nodes
     """
-    # copy the graph
-    new_graph = copy_graph(ugraph)
+    # overlay the graph instead of copying it
+    new_graph = RemovalOverlay(ugraph)
+    base_graph = new_graph.graph()
+    degrees = new_graph.degrees()
+
+    # scan the nodes in the order a copy of the graph would have, so ties go to the same node as before
+    nodes = [base_graph.node_index(node) for node in dict((node, None) for node in ugraph)]
 
     order = []
-    while len(new_graph) > 0:
+    while nodes:
         max_degree = -1
-        for node in new_graph:
-            if len(new_graph[node]) > max_degree:
-                max_degree = len(new_graph[node])
+        for node in nodes:
+            if degrees[node] > max_degree:
+                max_degree = degrees[node]
                 max_degree_node = node
 
-        neighbors = new_graph[max_degree_node]
-        new_graph.pop(max_degree_node)
-        for neighbor in neighbors:
-            new_graph[neighbor].remove(max_degree_node)
+        new_graph.delete_index(max_degree_node)
+        nodes.remove(max_degree_node)
 
-        order.append(max_degree_node)
+        order.append(base_graph.node_label(max_degree_node))
     return order
@@ -0,0 +1,160 @@
+"""
+Locality-improving node reordering for CSR graphs
+
+Node ids in the data files arrive in arbitrary order, so a traversal jumps all over the offset and target arrays.
+Renumbering the nodes so that neighbours get nearby ids keeps each search within a smaller window of memory:
+
+    degree  highest degree first, the hubs (touched by most searches) share the first cache lines
+    bfs     breadth-first order, component by component
+    rcm     reverse Cuthill-McKee: breadth-first from a low-degree node, neighbours by increasing degree, then
+            reversed; keeps the ids of every edge's endpoints close together (small bandwidth)
+
+Every reordering keeps its permutation so results can be mapped back to the original nodes.
+"""
+__author__ = 'mamaray'
+
+from array import array
+from collections import deque
+from algorithmic_thinking import csr_graph
+
+# supported orders, see node_order
+MODES = ("degree", "bfs", "rcm")
+
+
+def _breadth_first(graph, starts, by_degree):
+    """
+    Dense ids in breadth-first order, starting a new search at the next unvisited entry of starts
+
+    :rtype : array
+    :param graph: CSRGraph
+    :param starts: dense ids to start searches from, in order
+    :param by_degree: visit the neighbours of a node by increasing degree (Cuthill-McKee)
+    """
+    offsets = graph.offsets()
+    targets = graph.targets()
+    degrees = graph.out_degrees()
+
+    visited = bytearray(graph.num_nodes())
+    order = array(csr_graph.INDEX_TYPECODE)
+    queue = deque()
+
+    for start in starts:
+        if visited[start]:
+            continue
+        visited[start] = 1
+        order.append(start)
+        queue.append(start)
+
+        while queue:
+            node = queue.popleft()
+            neighbours = [neighbour for neighbour in targets[offsets[node]:offsets[node + 1]]
+                          if not visited[neighbour]]
+            if by_degree:
+                neighbours.sort(key=degrees.__getitem__)
+            for neighbour in neighbours:
+                visited[neighbour] = 1
+                order.append(neighbour)
+                queue.append(neighbour)
+
+    return order
+
+
+def node_order(ugraph, mode="rcm"):
+    """
+    Compute a new order of the nodes of a graph
+
+    :rtype : array
+    :param ugraph: graph (dictionary or csr_graph.CSRGraph)
+    :param mode: one of MODES
+    :return: int32 array of dense ids of ugraph's CSRGraph in their new order, entry i is the node that gets new id i
+    """
+    graph = csr_graph.as_csr(ugraph)
+    degrees = graph.out_degrees()
+    num_nodes = graph.num_nodes()
+
+    if mode == "degree":
+        return array(csr_graph.INDEX_TYPECODE, sorted(xrange(num_nodes), key=lambda idx: -degrees[idx]))
+
+    if mode == "bfs":
+        return _breadth_first(graph, xrange(num_nodes), False)
+
+    if mode == "rcm":
+        # each component is started from its lowest-degree node
+        order = _breadth_first(graph, sorted(xrange(num_nodes), key=degrees.__getitem__), True)
+        order.reverse()
+        return order
+
+    raise ValueError("unknown order: %s (expected one of %s)" % (mode, ", ".join(MODES)))
+
+
+def permute(ugraph, order, relabel=False):
+    """
+    Build the graph with its dense ids renumbered in the given order
+
+    Rows are laid out in the new order and every row's neighbours are sorted by their new id.
+
+    :rtype : csr_graph.CSRGraph
+    :param ugraph: graph (dictionary or csr_graph.CSRGraph)
+    :param order: new order of the dense ids, as from node_order
+    :param relabel: label the nodes 0..n-1 in the new order instead of keeping their labels
+    """
+    graph = csr_graph.as_csr(ugraph)
+    offsets = graph.offsets()
+    targets = graph.targets()
+    num_nodes = graph.num_nodes()
+
+    if len(order) != num_nodes:
+        raise ValueError("order has %d entries for %d nodes" % (len(order), num_nodes))
+
+    # new id of every old id
+    position = array(csr_graph.INDEX_TYPECODE, [-1]) * num_nodes
+    for new_idx, old_idx in enumerate(order):
+        position[old_idx] = new_idx
+
+    new_offsets = array(csr_graph.INDEX_TYPECODE, [0])
+    new_targets = array(csr_graph.INDEX_TYPECODE)
+    for old_idx in order:
+        new_targets.extend(sorted(position[neighbour] for neighbour in targets[offsets[old_idx]:offsets[old_idx + 1]]))
+        new_offsets.append(len(new_targets))
+
+    if relabel:
+        labels = xrange(num_nodes)
+    else:
+        old_labels = graph.labels()
+        labels = [old_labels[idx] for idx in order]
+
+    return csr_graph.CSRGraph(labels, new_offsets, new_targets)
+
+
+def reorder(ugraph, mode="rcm", relabel=False):
+    """
+    Renumber a graph for locality
+
+    With relabel=False the nodes keep their labels, so every function taking a graph returns results about the
+    original nodes as before, only the dense ids underneath change. With relabel=True the nodes are labelled
+    0..n-1 in the new order, and permutation maps the results back: new node i is permutation[i].
+
+    :rtype : tuple
+    :param ugraph: graph (dictionary or csr_graph.CSRGraph)
+    :param mode: one of MODES
+    :param relabel: label the nodes 0..n-1 in the new order
+    :return: (graph, permutation) where permutation lists the original node labels in the new order
+    """
+    graph = csr_graph.as_csr(ugraph)
+    order = node_order(graph, mode)
+
+    labels = graph.labels()
+    return permute(graph, order, relabel), [labels[idx] for idx in order]
+
+
+def restore(values, permutation):
+    """
+    Map a result about the nodes of a relabelled graph back to the original nodes
+
+    :param values: dict keyed by new node labels, or an iterable of new node labels
+    :param permutation: permutation returned by reorder
+    :return: the same dict keyed by the original labels, or a list of original labels
+    """
+    if isinstance(values, dict):
+        return dict((permutation[node], value) for node, value in values.iteritems())
+    return [permutation[node] for node in values]
@@ -1,38 +1,313 @@
 __author__ = 'ray'
 
+import os
+import heapq
+import shutil
+import tempfile
+from array import array
+from itertools import groupby
+from operator import itemgetter
 import algorithmic_thinking.module1.project as m1project
+from algorithmic_thinking import csr_graph
 
+# default chunk size for streaming graph files
+CHUNK_SIZE = 1 << 20
 
-def read_graph_data(filename):
-    """
-    A function to read data from a file
+# stream_degree_distributions keeps counters for node ids below this in arrays (512MB), and spills above it
+MAX_NODE_ID = 1 << 26
 
-    :param filename: file to read data from
-    :rtype : dict
+# number of nodes per sorted run when stream_degree_distributions spills to disk
+RUN_SIZE = 1 << 20
+
+# spilled records are int64 (node, in-degree, out-degree + 1) triples
+SPILL_TYPECODE = 'l'
+
+
+def _parse_rows(lines):
     """
-    # read in the citation data first
-    file = open(filename, "r")
-    raw_data = file.read().split("\n")
-    file.close()
+    Parse adjacency lines of the form "node neighbour neighbour ..."
 
-    # make a dictionary object from the raw data
-    graph = {}
-    for line in raw_data:
+    :param lines: iterable of text lines
+    :return: generator of (node, list of neighbours) tuples
+    """
+    for line in lines:
         # support empty files
         line = line.strip()
         if line == "":
             continue
 
         # first item is a node in the graph
-        neighbours = line.split(" ")
+        neighbours = line.split()
         node = int(neighbours.pop(0))
 
-        # initialize the node data
-        graph[node] = set([])
-        for entry in neighbours:
-            graph[node].add(int(entry))
+        yield node, [int(entry) for entry in neighbours]
+
+
+def _read_chunks(file, chunk_size):
+    """
+    Read a file in fixed-size chunks
+
+    :param file: open file object
+    :param chunk_size: number of bytes per chunk
+    :return: generator of strings
+    """
+    while True:
+        chunk = file.read(chunk_size)
+        if chunk == "":
+            return
+        yield chunk
+
+
+def _split_lines(chunks):
+    """
+    Re-assemble lines from a stream of chunks, carrying partial lines over chunk boundaries
+
+    :param chunks: iterable of strings
+    :return: generator of lines (without the newline)
+    """
+    partial = ""
+    for chunk in chunks:
+        lines = chunk.split("\n")
+
+        # the first piece finishes the line left over from the previous chunk
+        lines[0] = partial + lines[0]
+
+        # the last piece may be cut off, hold it back until the next chunk
+        partial = lines.pop()
+
+        for line in lines:
+            yield line
+
+    if partial != "":
+        yield partial
+
+
+def read_graph_data(filename, compact=False, chunk_size=None, cache=False):
+    """
+    A function to read data from a file
+
+    With a chunk_size the file is streamed in chunks of that many bytes and each adjacency row goes straight into
+    the graph, so the raw text is never held in memory as a whole.
+
+    With cache the parsed graph is kept in a binary sidecar file (see csr_graph.cache_filename) next to filename.
+    Later calls load the sidecar instead of parsing the text, as long as the file's path, size and mtime still match.
+
+    :param filename: file to read data from
+    :param compact: return a csr_graph.CSRGraph instead of a dict
+    :param chunk_size: stream the file in chunks of this many bytes (e.g. CHUNK_SIZE), None reads it all at once
+    :param cache: read and write the binary sidecar cache
+    :rtype : dict
+    """
+    if cache:
+        graph = csr_graph.read_cache(filename)
+        if graph is None:
+            graph = read_graph_data(filename, compact=True, chunk_size=chunk_size)
+            csr_graph.write_cache(graph, filename)
+
+        if compact:
+            return graph
+        return graph.to_dict()
+
+    file = open(filename, "r")
+    try:
+        if chunk_size is None:
+            # read in the citation data first
+            raw_data = file.read().split("\n")
+        else:
+            raw_data = _split_lines(_read_chunks(file, chunk_size))
+
+        if compact:
+            return csr_graph.from_adjacency(_parse_rows(raw_data))
+
+        # make a dictionary object from the raw data
+        graph = {}
+        for node, neighbours in _parse_rows(raw_data):
+            # initialize the node data
+            graph[node] = set(neighbours)
+
+        return graph
+    finally:
+        file.close()
+
+
+def _merge_counts(counts, node, in_count, out_count):
+    """
+    Add one node's partial counts to a record dict
+
+    :param counts: dict of node -> [in-degree, out-degree + 1 (0 if the node has no row yet)]
+    :param node: node id
+    :param in_count: in-degree to add
+    :param out_count: out-degree + 1 of the node's row, or 0
+    """
+    entry = counts.get(node)
+    if entry is None:
+        counts[node] = [in_count, out_count]
+    else:
+        entry[0] += in_count
+        entry[1] = max(entry[1], out_count)
+
+
+def _write_run(counts, spill_dir):
+    """
+    Sort a record dict by node id and write it to a run file of (node, in-degree, out-degree + 1) int64 triples
+
+    :rtype : str
+    :param counts: record dict, see _merge_counts
+    :param spill_dir: directory for the run file
+    :return: name of the run file
+    """
+    records = array(SPILL_TYPECODE)
+    for node in sorted(counts):
+        records.append(node)
+        records.extend(counts[node])
+
+    handle, filename = tempfile.mkstemp(suffix=".run", dir=spill_dir)
+    run = os.fdopen(handle, "wb")
+    records.tofile(run)
+    run.close()
+    return filename
+
+
+def _read_run(filename, block_size):
+    """
+    Read the records of a run file back in blocks
+
+    :param filename: run file name
+    :param block_size: number of records per block
+    :return: generator of (node, in-degree, out-degree + 1) tuples
+    """
+    run = open(filename, "rb")
+    try:
+        while True:
+            records = array(SPILL_TYPECODE)
+            try:
+                records.fromfile(run, 3 * block_size)
+            except EOFError:
+                # the last block is short, fromfile keeps what it could read
+                pass
+            if not records:
+                return
+            for idx in xrange(0, len(records), 3):
+                yield records[idx], records[idx + 1], records[idx + 2]
+    finally:
+        run.close()
+
+
+def _combine_records(groups):
+    """
+    Add up the merged records of each node
+
+    :param groups: iterable of (node, iterable of records) pairs, as produced by groupby
+    :return: generator of (node, in-degree, out-degree + 1) tuples
+    """
+    for node, group in groups:
+        in_count = 0
+        out_count = 0
+        for dummy_node, record_in, record_out in group:
+            in_count += record_in
+            out_count = max(out_count, record_out)
+        yield node, in_count, out_count
+
+
+def stream_degree_distributions(filename, chunk_size=CHUNK_SIZE, max_node_id=MAX_NODE_ID, run_size=RUN_SIZE,
+                                spill_dir=None):
+    """
+    Compute degree statistics of a graph file in one streaming pass, without building the graph
+
+    Counters live in two int32 arrays indexed by node id while the ids stay below max_node_id. Once a larger (or
+    negative) id shows up the counters are spilled to disk: counts are collected for at most run_size nodes at a time,
+    written as sorted run files and finally merged (external sort), so memory stays bounded whatever the id space.
+
+    As with read_graph_data the nodes are the ones that have a row; edges to nodes without a row are not counted.
+    Each node is expected to have a single row. The in-degree distribution matches
+    module1.project.in_degree_distribution(read_graph_data(filename)).
+
+    :rtype : dict
+    :param filename: graph file in read_graph_data's format
+    :param chunk_size: number of bytes read at a time
+    :param max_node_id: largest id space kept in memory as arrays
+    :param run_size: number of nodes per spilled run
+    :param spill_dir: directory for run files, defaults to the system temp directory
+    :return: dict with num_nodes, num_edges, in_degree_distribution and out_degree_distribution
+    """
+    # in-degree and out-degree + 1 (0 for nodes without a row) by node id, and the ids that have a row
+    in_counts = array(csr_graph.INDEX_TYPECODE)
+    out_counts = array(csr_graph.INDEX_TYPECODE)
+    row_ids = array(SPILL_TYPECODE)
+
+    # spill mode state
+    counts = None
+    runs = []
+    run_dir = None
+
+    try:
+        data = open(filename, "r")
+        try:
+            for node, neighbours in _parse_rows(_split_lines(_read_chunks(data, chunk_size))):
+                neighbours = set(neighbours)
+
+                # switch to spilling once an id does not fit the arrays
+                if counts is None and not all(0 <= entry < max_node_id for entry in neighbours | set([node])):
+                    run_dir = tempfile.mkdtemp(dir=spill_dir)
+                    counts = {}
+                    for entry in xrange(len(in_counts)):
+                        if in_counts[entry] or out_counts[entry]:
+                            counts[entry] = [in_counts[entry], out_counts[entry]]
+                            if len(counts) >= run_size:
+                                runs.append(_write_run(counts, run_dir))
+                                counts = {}
+                    in_counts = out_counts = row_ids = None
+
+                if counts is None:
+                    # grow the arrays (at least doubling) to cover the new ids
+                    top = max(neighbours | set([node])) + 1
+                    if top > len(in_counts):
+                        grow = min(max(top, 2 * len(in_counts)), max_node_id) - len(in_counts)
+                        in_counts.extend(array(csr_graph.INDEX_TYPECODE, [0]) * grow)
+                        out_counts.extend(array(csr_graph.INDEX_TYPECODE, [0]) * grow)
+
+                    out_counts[node] = len(neighbours) + 1
+                    row_ids.append(node)
+                    for entry in neighbours:
+                        in_counts[entry] += 1
+                else:
+                    _merge_counts(counts, node, 0, len(neighbours) + 1)
+                    for entry in neighbours:
+                        _merge_counts(counts, entry, 1, 0)
+                    if len(counts) >= run_size:
+                        runs.append(_write_run(counts, run_dir))
+                        counts = {}
+        finally:
+            data.close()
+
+        in_dist = {}
+        out_dist = {}
+        num_edges = 0
+
+        if counts is None:
+            records = ((node, in_counts[node], out_counts[node]) for node in row_ids)
+        else:
+            if counts:
+                runs.append(_write_run(counts, run_dir))
+
+            # merge the sorted runs and add up the records of each node
+            merged = heapq.merge(*[_read_run(run, run_size // max(len(runs), 1) + 1) for run in runs])
+            records = _combine_records(groupby(merged, itemgetter(0)))
+
+        for dummy_node, in_count, out_count in records:
+            # skip nodes without a row
+            if out_count == 0:
+                continue
+
+            in_dist[in_count] = in_dist.get(in_count, 0) + 1
+            out_dist[out_count - 1] = out_dist.get(out_count - 1, 0) + 1
+            num_edges += out_count - 1
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir)
 
-    return graph
+    return {"num_nodes": sum(in_dist.values()), "num_edges": num_edges, "in_degree_distribution": in_dist,
+            "out_degree_distribution": out_dist}
 
 
 def print_graph_data(graph, name=""):